@@ -0,0 +1,28 @@
+"""
+Settings profiles. DJANGO_ENV selects one:
+
+    dev   (default) - DEBUG, admin, sessions and the full middleware stack
+    test  - dev, minus DEBUG and with fast password hashing; the default for
+            `python manage.py test` (see manage.py)
+    prod  - read-only catalog: trimmed apps and middleware, cached templates,
+            persistent database connections
+
+DJANGO_SETTINGS_MODULE stays "DjangoProject.settings" for all of them.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+DJANGO_ENV = os.environ.get("DJANGO_ENV", "dev")
+
+if DJANGO_ENV == "prod":
+    from .prod import *  # noqa: F401,F403
+elif DJANGO_ENV == "test":
+    from .test import *  # noqa: F401,F403
+elif DJANGO_ENV == "dev":
+    from .dev import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(
+        f"Unknown DJANGO_ENV {DJANGO_ENV!r}; expected dev, test or prod."
+    )
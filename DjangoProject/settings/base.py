@@ -1,7 +1,9 @@
 """
-Django settings for DjangoProject project.
+Django settings for DjangoProject project - shared by every profile.
 
 Generated by 'django-admin startproject' using Django 5.2.5.
+The dev, test and prod profiles in this package import these settings and
+adjust them; DJANGO_ENV picks the profile (see __init__.py).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/topics/settings/
@@ -10,10 +12,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 
 # Quick-start development settings - unsuitable for production
@@ -23,7 +26,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = "django-insecure-)q6ea#wq67cdbq(#f1q6(#2n+xj_x#5g-%%h#$8wrcq_9t5ek^"
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Only the dev profile turns it on. With DEBUG on, Django keeps every SQL query in memory.
+DEBUG = False
 
 ALLOWED_HOSTS = []
 
@@ -43,6 +47,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Serves collected static files (precompressed, far-future cache headers)
+    "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -86,11 +92,11 @@ DATABASES = {
     # Connect to the PostgreSQL database
     "default": {
         "ENGINE": "django.db.backends.postgresql",
-        "NAME": "DjangoTraders",
-        "USER": "postgres",
-        "PASSWORD": "Maheen04",
-        "HOST": "localhost",
-        "PORT": "5432",
+        "NAME": os.environ.get("DB_NAME", "DjangoTraders"),
+        "USER": os.environ.get("DB_USER", "postgres"),
+        "PASSWORD": os.environ.get("DB_PASSWORD", "Maheen04"),
+        "HOST": os.environ.get("DB_HOST", "localhost"),
+        "PORT": os.environ.get("DB_PORT", "5432"),
     }
 }
 
@@ -133,6 +139,71 @@ STATIC_URL = "static/"
 STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# collectstatic content-hashes every file (e.g. site.3f2a9c.css), records the
+# names in a manifest and writes .gz / .br copies next to them. WhiteNoise
+# serves the hashed files with a ten year "immutable" Cache-Control header.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
+# Bundles built by `python manage.py build_assets` (paths relative to static/).
+# All third-party assets are vendored under static/vendor/ - no CDN requests.
+ASSET_SOURCE_DIR = BASE_DIR / "static"
+ASSET_BUNDLES = {
+    "bundles/site.css": [
+        "vendor/bootstrap/css/bootstrap.min.css",
+        "vendor/fontawesome/css/fontawesome.min.css",
+        "vendor/fontawesome/css/solid.min.css",
+        "css/styles.css",
+    ],
+    "bundles/site.js": [
+        "vendor/jquery/jquery-3.7.1.min.js",
+        "vendor/bootstrap/js/bootstrap.bundle.min.js",
+    ],
+}
+
+
+# In-memory geo aggregates (DjangoTradersApp.geoAggregates)
+# Seconds before the country/region/city counts are rebuilt from the database.
+# Picks up writes made by other workers or bulk updates that skip model signals.
+GEO_AGGREGATES_MAX_AGE = 300
+
+
+# Product recommendations (DjangoTradersApp.recommendations)
+# Number of "frequently bought together" products stored per product.
+RECOMMENDATIONS_TOP_K = 5
+
+
+# Revenue time series (DjangoTradersApp.revenue)
+# Most buckets one response may hold; longer ranges are charted at a coarser granularity.
+REVENUE_MAX_POINTS = 500
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Per-process memory. Holds the closed revenue buckets, one entry per
+# (granularity, filters) series; sized well past the default 300 entries so
+# filtered series (per customer / product / employee) are not evicted.
+# Point this at a shared backend (Redis, Memcached) to share it between workers.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "djangotraders",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
+
+# Tests
+# Creates the Northwind tables (managed = False models) in the test database.
+TEST_RUNNER = "DjangoTradersApp.testRunner.NorthwindTestRunner"
 
 
 # Default primary key field type
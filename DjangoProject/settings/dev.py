@@ -0,0 +1,7 @@
+"""
+Development profile (DJANGO_ENV=dev, the default).
+"""
+
+from .base import *  # noqa: F401,F403
+
+DEBUG = True
@@ -0,0 +1,85 @@
+"""
+Production profile (DJANGO_ENV=prod) for the read-only catalog workers.
+
+Everything the public pages do not use is left out, so workers import less
+and run fewer middlewares per request: no admin, auth, sessions, messages or
+password validators. Guarded by `manage.py bench_startup --check` and by
+BenchStartupTests in DjangoTradersApp/tests.py.
+
+What a worker still imports is loaded lazily where that saves anything:
+templates are compiled on first use (cached loader), the database connection
+opens on the first query, and NumPy (RFM scoring, recommendations) is only
+imported by the management commands. The rest is Django's request, ORM and
+template core, which every request needs; deferring it would only move its
+cost into the first request.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+
+DEBUG = False
+
+try:
+    SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
+except KeyError:
+    raise ImproperlyConfigured("Set DJANGO_SECRET_KEY for the prod profile.")
+
+ALLOWED_HOSTS = os.environ.get("DJANGO_ALLOWED_HOSTS", "localhost").split(",")
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    "django.contrib.staticfiles",
+    "DjangoTradersApp",
+]
+
+MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [
+            BASE_DIR / "static" / "templates",
+        ],
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.request",
+                "DjangoTradersApp.contextUtilities.today",
+            ],
+            # Compile each template once per worker.
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
+        },
+    },
+]
+
+AUTH_PASSWORD_VALIDATORS = []
+
+
+# Database
+# Keep connections open between requests instead of reconnecting every time.
+
+DATABASES = {
+    "default": {
+        **DATABASES["default"],
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "600")),
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
@@ -0,0 +1,18 @@
+"""
+Test profile (DJANGO_ENV=test): the dev apps, without DEBUG's query log.
+"""
+
+from .dev import *  # noqa: F401,F403
+
+DEBUG = False
+
+# Hashing speed does not matter for test users.
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# Tests do not run collectstatic, so there is no manifest to look names up in.
+STORAGES = {
+    **STORAGES,
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
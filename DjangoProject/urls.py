@@ -15,12 +15,17 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from django.contrib import admin
+from django.apps import apps
 from django.urls import include, path
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
     # Include the URLs defined in for DjangoTradersApp from its urls.py file (DjangoTradersApp.urls).
     # All other views will be added from here.
     path("", include("DjangoTradersApp.urls")),
 ]
+
+# The prod settings profile leaves the admin out; only import it when installed.
+if apps.is_installed("django.contrib.admin"):
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path("admin/", admin.site.urls))
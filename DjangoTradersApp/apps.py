@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class DjangotradersappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'DjangoTradersApp'
+
+    def ready(self):
+        # Register the signal handlers that keep the in-memory aggregates current.
+        from . import signals  # noqa: F401
@@ -0,0 +1,228 @@
+"""
+In-memory customer and order counts by country -> region -> city.
+
+The counts are built from two grouped queries (one over Customers, one over
+Orders.ship_*) and then kept current by the model signals registered in
+apps.py, so the drill-down endpoints never run a GROUP BY per request.
+
+Writes that bypass signals (queryset.update(), bulk_create(), raw SQL or other
+worker processes) are picked up by the periodic rebuild controlled by the
+GEO_AGGREGATES_MAX_AGE setting (seconds).
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count
+
+from .models import Customers, Orders
+
+DEFAULT_MAX_AGE = 300
+
+
+class GeoNode:
+    """
+    One level of the country -> region -> city tree.
+    __slots__ keeps each node to three attributes, no per-instance dict.
+    """
+
+    __slots__ = ("customers", "orders", "children")
+
+    def __init__(self):
+        self.customers = 0
+        self.orders = 0
+        self.children = {}
+
+    def child(self, name):
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = GeoNode()
+        return node
+
+
+class GeoAggregates:
+    """
+    Hierarchical customer / order counts served from memory.
+
+    The tree is built lazily on first use and rebuilt when it is older
+    than GEO_AGGREGATES_MAX_AGE or after invalidate() is called.
+    Signal handlers apply +1 / -1 deltas in between.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._root = None
+        self._built_at = 0.0
+
+    # region Building
+
+    def _max_age(self):
+        return getattr(settings, "GEO_AGGREGATES_MAX_AGE", DEFAULT_MAX_AGE)
+
+    def _build(self):
+        root = GeoNode()
+
+        customer_rows = (
+            Customers.objects.values_list("country", "region", "city")
+            .annotate(total=Count("pk"))
+            .order_by()
+        )
+        for country, region, city, total in customer_rows:
+            for node in self._path(root, country, region, city):
+                node.customers += total
+
+        order_rows = (
+            Orders.objects.values_list("ship_country", "ship_region", "ship_city")
+            .annotate(total=Count("pk"))
+            .order_by()
+        )
+        for country, region, city, total in order_rows:
+            for node in self._path(root, country, region, city):
+                node.orders += total
+
+        return root
+
+    def _tree(self):
+        """
+        Return the current tree, (re)building it if missing or stale.
+        """
+        with self._lock:
+            if self._root is None or time.monotonic() - self._built_at > self._max_age():
+                self._root = self._build()
+                self._built_at = time.monotonic()
+            return self._root
+
+    def invalidate(self):
+        """
+        Drop the tree; the next read rebuilds it from the database.
+        """
+        with self._lock:
+            self._root = None
+
+    # endregion Building
+
+    # region Incremental updates
+
+    @staticmethod
+    def _path(root, country, region, city):
+        """
+        Returns [root, country, region, city] nodes, creating any that are missing.
+        """
+        country_node = root.child(country)
+        region_node = country_node.child(region)
+        return [root, country_node, region_node, region_node.child(city)]
+
+    def _count(self, location, field):
+        """
+        The current `field` count at the city node for location, 0 if it is missing.
+        """
+        node = self._root
+        for name in location:
+            node = node.children.get(name)
+            if node is None:
+                return 0
+        return getattr(node, field)
+
+    def _apply(self, location, field, delta):
+        with self._lock:
+            if self._root is None:
+                # Nothing built yet; the first read will see this change anyway.
+                return
+            if delta < 0 and self._count(location, field) <= 0:
+                # Counts have drifted from the database (e.g. another worker
+                # already removed this row, or the tree was rebuilt between the
+                # commit and this callback); start again from a fresh build.
+                self._root = None
+                return
+            nodes = self._path(self._root, *location)
+            for node in nodes:
+                setattr(node, field, getattr(node, field) + delta)
+            # Prune empty nodes bottom-up so deleted places disappear.
+            for depth in (3, 2, 1):
+                node = nodes[depth]
+                if node.customers or node.orders or node.children:
+                    break
+                del nodes[depth - 1].children[location[depth - 1]]
+
+    def add_customer(self, location):
+        self._apply(location, "customers", 1)
+
+    def remove_customer(self, location):
+        self._apply(location, "customers", -1)
+
+    def add_order(self, location):
+        self._apply(location, "orders", 1)
+
+    def remove_order(self, location):
+        self._apply(location, "orders", -1)
+
+    # endregion Incremental updates
+
+    # region Reading
+
+    def summary(self, *path):
+        """
+        Returns the totals for one level of the tree and its children.
+
+        No path: the whole world broken down by country.
+        (country,): that country broken down by region.
+        (country, region): that region broken down by city.
+        None is a valid name - it is where rows without a region / city are counted.
+
+        Returns None when the requested country / region is unknown.
+        """
+        with self._lock:
+            node = self._tree()
+            for name in path:
+                node = node.children.get(name)
+                if node is None:
+                    return None
+
+            return {
+                "path": list(path),
+                "customers": node.customers,
+                "orders": node.orders,
+                "children": [
+                    {
+                        "name": name,
+                        "customers": child.customers,
+                        "orders": child.orders,
+                        "has_children": bool(child.children),
+                    }
+                    for name, child in sorted(
+                        node.children.items(), key=lambda item: _sort_key(item[0])
+                    )
+                ],
+            }
+
+    def countries(self):
+        """
+        Returns the sorted list of countries that have at least one customer.
+        Same result as Customers.get_countries(), without the DISTINCT query.
+        """
+        with self._lock:
+            root = self._tree()
+            return sorted(
+                (name for name, node in root.children.items() if node.customers),
+                key=_sort_key,
+            )
+
+    # endregion Reading
+
+
+def _sort_key(name):
+    # None (no region / city recorded) sorts last.
+    return (name is None, name or "")
+
+
+def customer_location(customer):
+    return (customer.country, customer.region, customer.city)
+
+
+def order_location(order):
+    return (order.ship_country, order.ship_region, order.ship_city)
+
+
+# Module-level instance shared by the views and signal handlers.
+geo_aggregates = GeoAggregates()
@@ -0,0 +1,104 @@
+"""
+Compare the buffered render() and streaming paths of views.CustomersList.
+
+    python manage.py bench_customers_list [--repeat 5]
+
+Each path runs in its own child process so the peak RSS reported for one is
+not inflated by the other. Time to first byte (TTFB) for render() is the time
+to build the whole response; for streaming it is the time to the first chunk.
+Run it against a database with a realistic number of customers.
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from DjangoTradersApp import views
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+MODES = {
+    "render": "0",
+    "stream": "1",
+}
+
+
+def peak_rss_kib():
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class Command(BaseCommand):
+    help = "Benchmark TTFB, total time and peak RSS of CustomersList, render() vs streaming."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5)
+        # Internal: run one mode and print its measurements as JSON.
+        parser.add_argument("--mode", choices=MODES, help="(internal)")
+
+    def handle(self, *args, **options):
+        if options["mode"]:
+            self.stdout.write(json.dumps(self.measure(options["mode"], options["repeat"])))
+            return
+
+        self.stdout.write(
+            f"{'mode':<8}{'ttfb ms':>10}{'total ms':>10}{'KiB sent':>10}"
+            f"{'RSS KiB':>10}{'RSS +KiB':>10}"
+        )
+        for mode in MODES:
+            child = subprocess.run(
+                [sys.executable, sys.argv[0], "bench_customers_list",
+                 "--mode", mode, "--repeat", str(options["repeat"])],
+                capture_output=True, text=True, check=True,
+            )
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            self.stdout.write(
+                f"{mode:<8}{result['ttfb_ms']:>10.2f}{result['total_ms']:>10.2f}"
+                f"{result['bytes'] // 1024:>10}"
+                f"{str(result['peak_rss_kib']):>10}{str(result['rss_growth_kib']):>10}"
+            )
+
+    def measure(self, mode, repeat):
+        factory = RequestFactory()
+        request_path = f"/customers/?stream={MODES[mode]}"
+
+        baseline_rss = peak_rss_kib()
+        # Load templates, URL resolvers and the DB connection outside the timings.
+        b"".join(views.CustomersList(factory.get(request_path)))
+
+        ttfbs, totals = [], []
+        sent = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = views.CustomersList(factory.get(request_path))
+            if response.streaming:
+                chunks = iter(response.streaming_content)
+                sent = len(next(chunks))
+                ttfbs.append(time.perf_counter() - start)
+                for chunk in chunks:
+                    sent += len(chunk)
+            else:
+                ttfbs.append(time.perf_counter() - start)
+                sent = len(response.content)
+            totals.append(time.perf_counter() - start)
+
+        peak_rss = peak_rss_kib()
+        return {
+            "ttfb_ms": statistics.median(ttfbs) * 1000,
+            "total_ms": statistics.median(totals) * 1000,
+            "bytes": sent,
+            "peak_rss_kib": peak_rss,
+            "rss_growth_kib": None if peak_rss is None else peak_rss - baseline_rss,
+        }
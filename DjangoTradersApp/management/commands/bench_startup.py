@@ -0,0 +1,131 @@
+"""
+Measure how long a worker takes to start under each settings profile.
+
+    python manage.py bench_startup [--repeat 5] [--check] [--max-prod-ms 400]
+
+Each profile is started in a fresh `python -X importtime` process that loads
+the WSGI application and the URLconf, i.e. everything a worker does before its
+first request. Reported per profile: total import time (sum of the "self"
+column of -X importtime), number of modules imported and wall time.
+
+--check fails if the prod profile imports any module in PROD_FORBIDDEN_MODULES,
+is not faster than dev, or (with --max-prod-ms) exceeds the given budget.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROFILES = ["dev", "prod"]
+
+# Modules the trimmed prod profile must not pull in at startup.
+PROD_FORBIDDEN_MODULES = [
+    "django.contrib.admin",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "numpy",
+]
+
+WORKER_STARTUP = """
+import json, sys, time
+start = time.perf_counter()
+from DjangoProject.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+wall_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({"wall_ms": wall_ms, "modules": sorted(sys.modules)}))
+"""
+
+
+def forbidden_imports(modules):
+    """
+    The PROD_FORBIDDEN_MODULES found in a worker's imported module names.
+    """
+    return [name for name in PROD_FORBIDDEN_MODULES if name in modules]
+
+
+def import_time_ms(stderr):
+    """
+    Sum the "self" microseconds of every `import time:` line.
+    """
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us = line.split(":", 1)[1].split("|", 1)[0].strip()
+        if self_us.isdigit():
+            total_us += int(self_us)
+    return total_us / 1000
+
+
+class Command(BaseCommand):
+    help = "Benchmark worker import/startup time of the dev and prod settings profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Fail if the prod profile regresses (see module docstring).",
+        )
+        parser.add_argument("--max-prod-ms", type=float, default=None)
+
+    def start_worker(self, profile):
+        env = {
+            **os.environ,
+            "DJANGO_ENV": profile,
+            "DJANGO_SETTINGS_MODULE": os.environ.get(
+                "DJANGO_SETTINGS_MODULE", "DjangoProject.settings"
+            ),
+        }
+        # prod refuses to start without a secret key; any value will do here.
+        env.setdefault("DJANGO_SECRET_KEY", "bench-startup-only")
+        child = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", WORKER_STARTUP],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if child.returncode:
+            raise CommandError(f"{profile} worker failed to start:\n{child.stderr[-2000:]}")
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        result["import_ms"] = import_time_ms(child.stderr)
+        return result
+
+    def handle(self, *args, **options):
+        results = {}
+        self.stdout.write(f"{'profile':<8}{'import ms':>12}{'wall ms':>10}{'modules':>9}")
+        for profile in PROFILES:
+            runs = [self.start_worker(profile) for _ in range(options["repeat"])]
+            results[profile] = {
+                "import_ms": statistics.median(run["import_ms"] for run in runs),
+                "wall_ms": statistics.median(run["wall_ms"] for run in runs),
+                "modules": runs[-1]["modules"],
+            }
+            self.stdout.write(
+                f"{profile:<8}{results[profile]['import_ms']:>12.1f}"
+                f"{results[profile]['wall_ms']:>10.1f}{len(runs[-1]['modules']):>9}"
+            )
+
+        if not options["check"]:
+            return
+
+        prod, dev = results["prod"], results["dev"]
+        problems = [f"prod imports {name}" for name in forbidden_imports(prod["modules"])]
+        if prod["import_ms"] >= dev["import_ms"]:
+            problems.append(
+                f"prod import time {prod['import_ms']:.1f} ms is not below dev {dev['import_ms']:.1f} ms"
+            )
+        if options["max_prod_ms"] is not None and prod["import_ms"] > options["max_prod_ms"]:
+            problems.append(
+                f"prod import time {prod['import_ms']:.1f} ms exceeds {options['max_prod_ms']:.1f} ms"
+            )
+        if problems:
+            raise CommandError("; ".join(problems))
+        self.stdout.write("Startup check passed.")
@@ -0,0 +1,103 @@
+"""
+Bundle and minify the site's CSS and JavaScript.
+
+    python manage.py build_assets          # (re)write the bundles
+    python manage.py build_assets --check  # fail if a bundle is out of date
+
+The bundles are listed in settings.ASSET_BUNDLES and written under
+static/bundles/. Run this after editing static/css/styles.css or upgrading a
+vendored library, then run collectstatic as usual; the static files storage
+fingerprints and precompresses the bundles.
+"""
+
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Comments starting with /*! are licence headers and are kept.
+CSS_COMMENT = re.compile(r"/\*(?!!).*?\*/", re.DOTALL)
+CSS_WHITESPACE = re.compile(r"\s+")
+CSS_PUNCTUATION = re.compile(r"\s*([{};,])\s*")
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+SOURCE_MAP = re.compile(r"^\s*(//|/\*)# sourceMappingURL=.*$", re.MULTILINE)
+
+
+def minify_css(css):
+    """
+    Conservative CSS minifier: drops comments and redundant whitespace.
+    Only used for our own stylesheets; *.min.css vendor files are left as shipped.
+    """
+    css = CSS_COMMENT.sub("", css)
+    css = CSS_WHITESPACE.sub(" ", css)
+    css = CSS_PUNCTUATION.sub(r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def rebase_css_urls(css, source, bundle):
+    """
+    Rewrite relative url(...) references so they still resolve once the
+    rules are moved from `source` into `bundle` (both relative to static/).
+    """
+    source_dir = posixpath.dirname(source)
+    bundle_dir = posixpath.dirname(bundle)
+
+    def rebase(match):
+        url = match.group(2)
+        if url.startswith(("/", "data:", "#")) or "://" in url:
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(source_dir, url))
+        return f"url({posixpath.relpath(target, bundle_dir)})"
+
+    return CSS_URL.sub(rebase, css)
+
+
+class Command(BaseCommand):
+    help = "Concatenate and minify the bundles listed in settings.ASSET_BUNDLES."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Exit with an error if any bundle differs from its sources.",
+        )
+
+    def handle(self, *args, **options):
+        static_root = settings.ASSET_SOURCE_DIR
+        stale = []
+
+        for bundle, sources in settings.ASSET_BUNDLES.items():
+            parts = []
+            for source in sources:
+                path = static_root / source
+                if not path.exists():
+                    raise CommandError(f"{bundle}: missing source {source}")
+                text = SOURCE_MAP.sub("", path.read_text(encoding="utf-8"))
+                if bundle.endswith(".css"):
+                    text = rebase_css_urls(text, source, bundle)
+                    if not source.endswith(".min.css"):
+                        text = minify_css(text)
+                    parts.append(text.strip())
+                else:
+                    # Vendored scripts are already minified; the separator guards
+                    # against a file that does not end its last statement.
+                    parts.append(text.strip())
+
+            content = ("\n" if bundle.endswith(".css") else "\n;\n").join(parts) + "\n"
+            target = static_root / bundle
+
+            if target.exists() and target.read_text(encoding="utf-8") == content:
+                continue
+            if options["check"]:
+                stale.append(bundle)
+                continue
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(content, encoding="utf-8")
+            self.stdout.write(f"Wrote {bundle} ({len(content.encode()) // 1024} KiB)")
+
+        if stale:
+            raise CommandError(
+                "Out of date, run `python manage.py build_assets`: " + ", ".join(stale)
+            )
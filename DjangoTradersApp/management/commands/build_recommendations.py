@@ -0,0 +1,29 @@
+"""
+Refresh "frequently bought together" recommendations (see DjangoTradersApp.recommendations).
+
+    python manage.py build_recommendations          # only products on orders since the last run
+    python manage.py build_recommendations --full   # rebuild every product
+"""
+
+from django.core.management.base import BaseCommand
+
+from DjangoTradersApp.recommendations import build_recommendations
+
+
+class Command(BaseCommand):
+    help = "Build the top-K co-purchased products for each product."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild recommendations for every product.",
+        )
+
+    def handle(self, *args, **options):
+        run = build_recommendations(full=options["full"])
+        kind = "Full" if run.full else "Incremental"
+        self.stdout.write(
+            f"{kind} run: updated {run.products_updated} products "
+            f"(orders up to #{run.last_order_id})."
+        )
@@ -0,0 +1,32 @@
+"""
+Recompute customer RFM scores (see DjangoTradersApp.rfm).
+
+    python manage.py score_customers          # only customers who ordered since the last run
+    python manage.py score_customers --full   # everyone, with fresh quintile edges
+
+Schedule the incremental run as often as needed (e.g. hourly from cron) and a
+full run now and then (e.g. nightly) so recency keeps up with the calendar.
+"""
+
+from django.core.management.base import BaseCommand
+
+from DjangoTradersApp.rfm import score_customers
+
+
+class Command(BaseCommand):
+    help = "Score customers by recency, frequency and monetary value."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rescore every customer and recompute the quintile edges.",
+        )
+
+    def handle(self, *args, **options):
+        run = score_customers(full=options["full"])
+        kind = "Full" if run.full else "Incremental"
+        self.stdout.write(
+            f"{kind} run: scored {run.customers_scored} customers "
+            f"(orders up to #{run.last_order_id})."
+        )
@@ -0,0 +1,193 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Categories',
+            fields=[
+                ('category_id', models.SmallIntegerField(primary_key=True, serialize=False)),
+                ('category_name', models.CharField(max_length=15)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('picture', models.BinaryField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'categories',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Customers',
+            fields=[
+                ('customer_id', models.CharField(max_length=5, primary_key=True, serialize=False)),
+                ('company_name', models.CharField(max_length=40)),
+                ('contact_name', models.CharField(blank=True, max_length=30, null=True)),
+                ('contact_title', models.CharField(blank=True, max_length=30, null=True)),
+                ('address', models.CharField(blank=True, max_length=60, null=True)),
+                ('city', models.CharField(blank=True, max_length=15, null=True)),
+                ('region', models.CharField(blank=True, max_length=15, null=True)),
+                ('postal_code', models.CharField(blank=True, max_length=10, null=True)),
+                ('country', models.CharField(blank=True, max_length=15, null=True)),
+                ('phone', models.CharField(blank=True, max_length=24, null=True)),
+                ('fax', models.CharField(blank=True, max_length=24, null=True)),
+                ('password', models.CharField(blank=True, db_column='Password', max_length=64, null=True)),
+            ],
+            options={
+                'db_table': 'customers',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Employees',
+            fields=[
+                ('employee_id', models.SmallIntegerField(primary_key=True, serialize=False)),
+                ('last_name', models.CharField(max_length=20)),
+                ('first_name', models.CharField(max_length=10)),
+                ('title', models.CharField(blank=True, max_length=30, null=True)),
+                ('title_of_courtesy', models.CharField(blank=True, max_length=25, null=True)),
+                ('birth_date', models.DateField(blank=True, null=True)),
+                ('hire_date', models.DateField(blank=True, null=True)),
+                ('address', models.CharField(blank=True, max_length=60, null=True)),
+                ('city', models.CharField(blank=True, max_length=15, null=True)),
+                ('region', models.CharField(blank=True, max_length=15, null=True)),
+                ('postal_code', models.CharField(blank=True, max_length=10, null=True)),
+                ('country', models.CharField(blank=True, max_length=15, null=True)),
+                ('home_phone', models.CharField(blank=True, max_length=24, null=True)),
+                ('extension', models.CharField(blank=True, max_length=4, null=True)),
+                ('photo', models.BinaryField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('photo_path', models.CharField(blank=True, max_length=255, null=True)),
+            ],
+            options={
+                'db_table': 'employees',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderDetails',
+            fields=[
+                ('pk', models.CompositePrimaryKey('order_id', 'product_id', blank=True, editable=False, primary_key=True, serialize=False)),
+                ('unit_price', models.FloatField()),
+                ('quantity', models.SmallIntegerField()),
+                ('discount', models.FloatField()),
+            ],
+            options={
+                'db_table': 'order_details',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Orders',
+            fields=[
+                ('order_id', models.SmallIntegerField(primary_key=True, serialize=False)),
+                ('order_date', models.DateField(blank=True, null=True)),
+                ('required_date', models.DateField(blank=True, null=True)),
+                ('shipped_date', models.DateField(blank=True, null=True)),
+                ('freight', models.FloatField(blank=True, null=True)),
+                ('ship_name', models.CharField(blank=True, max_length=40, null=True)),
+                ('ship_address', models.CharField(blank=True, max_length=60, null=True)),
+                ('ship_city', models.CharField(blank=True, max_length=15, null=True)),
+                ('ship_region', models.CharField(blank=True, max_length=15, null=True)),
+                ('ship_postal_code', models.CharField(blank=True, max_length=10, null=True)),
+                ('ship_country', models.CharField(blank=True, max_length=15, null=True)),
+            ],
+            options={
+                'db_table': 'orders',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Products',
+            fields=[
+                ('product_id', models.SmallIntegerField(primary_key=True, serialize=False)),
+                ('product_name', models.CharField(max_length=40)),
+                ('quantity_per_unit', models.CharField(blank=True, max_length=20, null=True)),
+                ('unit_price', models.FloatField(blank=True, null=True)),
+                ('units_in_stock', models.SmallIntegerField(blank=True, null=True)),
+                ('units_on_order', models.SmallIntegerField(blank=True, null=True)),
+                ('reorder_level', models.SmallIntegerField(blank=True, null=True)),
+                ('discontinued', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'products',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Shippers',
+            fields=[
+                ('shipper_id', models.SmallIntegerField(primary_key=True, serialize=False)),
+                ('company_name', models.CharField(max_length=40)),
+                ('phone', models.CharField(blank=True, max_length=24, null=True)),
+            ],
+            options={
+                'db_table': 'shippers',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Suppliers',
+            fields=[
+                ('supplier_id', models.SmallIntegerField(primary_key=True, serialize=False)),
+                ('company_name', models.CharField(max_length=40)),
+                ('contact_name', models.CharField(blank=True, max_length=30, null=True)),
+                ('contact_title', models.CharField(blank=True, max_length=30, null=True)),
+                ('address', models.CharField(blank=True, max_length=60, null=True)),
+                ('city', models.CharField(blank=True, max_length=15, null=True)),
+                ('region', models.CharField(blank=True, max_length=15, null=True)),
+                ('postal_code', models.CharField(blank=True, max_length=10, null=True)),
+                ('country', models.CharField(blank=True, max_length=15, null=True)),
+                ('phone', models.CharField(blank=True, max_length=24, null=True)),
+                ('fax', models.CharField(blank=True, max_length=24, null=True)),
+                ('homepage', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'suppliers',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='RfmRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_at', models.DateTimeField(auto_now_add=True)),
+                ('full', models.BooleanField()),
+                ('last_order_id', models.IntegerField()),
+                ('customers_scored', models.IntegerField()),
+                ('quantile_edges', models.JSONField()),
+            ],
+            options={
+                'db_table': 'rfm_runs',
+                'get_latest_by': 'pk',
+            },
+        ),
+        migrations.CreateModel(
+            name='CustomerRfmScore',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='rfm', serialize=False, to='DjangoTradersApp.customers')),
+                ('last_order_date', models.DateField(blank=True, null=True)),
+                ('recency_days', models.IntegerField()),
+                ('frequency', models.IntegerField()),
+                ('monetary', models.FloatField()),
+                ('r_score', models.SmallIntegerField()),
+                ('f_score', models.SmallIntegerField()),
+                ('m_score', models.SmallIntegerField()),
+                ('rfm_score', models.SmallIntegerField(db_index=True)),
+                ('segment', models.CharField(max_length=20)),
+                ('scored_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'customer_rfm_scores',
+                'indexes': [models.Index(fields=['segment', '-rfm_score'], name='rfm_segment_score_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('DjangoTradersApp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_at', models.DateTimeField(auto_now_add=True)),
+                ('full', models.BooleanField()),
+                ('last_order_id', models.IntegerField()),
+                ('products_updated', models.IntegerField()),
+            ],
+            options={
+                'db_table': 'recommendation_runs',
+                'get_latest_by': 'pk',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.SmallIntegerField()),
+                ('orders_together', models.IntegerField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='recommendations', to='DjangoTradersApp.products')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='recommended_for', to='DjangoTradersApp.products')),
+            ],
+            options={
+                'db_table': 'product_recommendations',
+                'constraints': [models.UniqueConstraint(fields=('product', 'rank'), name='product_rank_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:02
+
+from django.db import migrations, models
+
+
+def set_segment_rank(apps, schema_editor):
+    CustomerRfmScore = apps.get_model("DjangoTradersApp", "CustomerRfmScore")
+    for rank, segment in enumerate(CUSTOMER_RFM_SEGMENTS):
+        CustomerRfmScore.objects.filter(segment=segment).update(segment_rank=rank)
+
+
+# CustomerRfmScore.SEGMENTS as of this migration
+CUSTOMER_RFM_SEGMENTS = [
+    "Champions",
+    "Loyal",
+    "Potential Loyal",
+    "New",
+    "Promising",
+    "Need Attention",
+    "About to Sleep",
+    "At Risk",
+    "Can't Lose",
+    "Hibernating",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('DjangoTradersApp', '0002_product_recommendations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customerrfmscore',
+            name='segment_rank',
+            field=models.SmallIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.RunPython(set_segment_rank, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='customerrfmscore',
+            index=models.Index(fields=['segment_rank', '-rfm_score'], name='rfm_rank_score_idx'),
+        ),
+    ]
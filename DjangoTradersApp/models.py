@@ -61,3 +61,333 @@ class Customers(models.Model):
             cls.objects.values_list("country", flat=True).distinct().order_by("country")
         )
         return countries
+
+    def get_recommended_products(self, limit=5):
+        """
+        Products often bought together with what this customer has ordered,
+        excluding anything they have already bought.
+        Reads the precomputed ProductRecommendation table (see recommendations.py).
+        """
+        # Evaluated once and reused by both the filter and the exclude,
+        # rather than embedding the same subquery twice.
+        bought = list(
+            OrderDetails.objects.filter(order__customer=self)
+            .values_list("product_id", flat=True)
+            .distinct()
+        )
+        return (
+            Products.objects.filter(recommended_for__product_id__in=bought)
+            .exclude(product_id__in=bought)
+            .annotate(orders_together=models.Sum("recommended_for__orders_together"))
+            .order_by("-orders_together", "product_name")[:limit]
+        )
+
+
+class Employees(models.Model):
+
+    # region Employee Fields from Database.
+    employee_id = models.SmallIntegerField(primary_key=True)
+    last_name = models.CharField(max_length=20)
+    first_name = models.CharField(max_length=10)
+    title = models.CharField(max_length=30, blank=True, null=True)
+    title_of_courtesy = models.CharField(max_length=25, blank=True, null=True)
+    birth_date = models.DateField(blank=True, null=True)
+    hire_date = models.DateField(blank=True, null=True)
+    address = models.CharField(max_length=60, blank=True, null=True)
+    city = models.CharField(max_length=15, blank=True, null=True)
+    region = models.CharField(max_length=15, blank=True, null=True)
+    postal_code = models.CharField(max_length=10, blank=True, null=True)
+    country = models.CharField(max_length=15, blank=True, null=True)
+    home_phone = models.CharField(max_length=24, blank=True, null=True)
+    extension = models.CharField(max_length=4, blank=True, null=True)
+    photo = models.BinaryField(blank=True, null=True)
+    notes = models.TextField(blank=True, null=True)
+    reports_to = models.ForeignKey(
+        "self", models.DO_NOTHING, db_column="reports_to", blank=True, null=True
+    )
+    photo_path = models.CharField(max_length=255, blank=True, null=True)
+
+    class Meta:
+        managed = False
+        db_table = "employees"
+
+    # endregion
+
+    def __str__(self):
+        return f"{self.first_name} {self.last_name}"
+
+
+class Shippers(models.Model):
+
+    # region Shipper Fields from Database.
+    shipper_id = models.SmallIntegerField(primary_key=True)
+    company_name = models.CharField(max_length=40)
+    phone = models.CharField(max_length=24, blank=True, null=True)
+
+    class Meta:
+        managed = False
+        db_table = "shippers"
+
+    # endregion
+
+    def __str__(self):
+        return self.company_name
+
+
+class Orders(models.Model):
+
+    # region Order Fields from Database.
+    order_id = models.SmallIntegerField(primary_key=True)
+    customer = models.ForeignKey(
+        Customers, models.DO_NOTHING, blank=True, null=True
+    )
+    employee = models.ForeignKey(
+        Employees, models.DO_NOTHING, blank=True, null=True
+    )
+    order_date = models.DateField(blank=True, null=True)
+    required_date = models.DateField(blank=True, null=True)
+    shipped_date = models.DateField(blank=True, null=True)
+    ship_via = models.ForeignKey(
+        Shippers, models.DO_NOTHING, db_column="ship_via", blank=True, null=True
+    )
+    freight = models.FloatField(blank=True, null=True)
+    ship_name = models.CharField(max_length=40, blank=True, null=True)
+    ship_address = models.CharField(max_length=60, blank=True, null=True)
+    ship_city = models.CharField(max_length=15, blank=True, null=True)
+    ship_region = models.CharField(max_length=15, blank=True, null=True)
+    ship_postal_code = models.CharField(max_length=10, blank=True, null=True)
+    ship_country = models.CharField(max_length=15, blank=True, null=True)
+
+    class Meta:
+        managed = False
+        db_table = "orders"
+
+    # endregion
+
+    def __str__(self):
+        return f"Order {self.order_id} [Customer: {self.customer_id}]"
+
+
+class Categories(models.Model):
+
+    # region Category Fields from Database.
+    category_id = models.SmallIntegerField(primary_key=True)
+    category_name = models.CharField(max_length=15)
+    description = models.TextField(blank=True, null=True)
+    picture = models.BinaryField(blank=True, null=True)
+
+    class Meta:
+        managed = False
+        db_table = "categories"
+
+    # endregion
+
+    def __str__(self):
+        return self.category_name
+
+
+class Suppliers(models.Model):
+
+    # region Supplier Fields from Database.
+    supplier_id = models.SmallIntegerField(primary_key=True)
+    company_name = models.CharField(max_length=40)
+    contact_name = models.CharField(max_length=30, blank=True, null=True)
+    contact_title = models.CharField(max_length=30, blank=True, null=True)
+    address = models.CharField(max_length=60, blank=True, null=True)
+    city = models.CharField(max_length=15, blank=True, null=True)
+    region = models.CharField(max_length=15, blank=True, null=True)
+    postal_code = models.CharField(max_length=10, blank=True, null=True)
+    country = models.CharField(max_length=15, blank=True, null=True)
+    phone = models.CharField(max_length=24, blank=True, null=True)
+    fax = models.CharField(max_length=24, blank=True, null=True)
+    homepage = models.TextField(blank=True, null=True)
+
+    class Meta:
+        managed = False
+        db_table = "suppliers"
+
+    # endregion
+
+    def __str__(self):
+        return self.company_name
+
+
+class Products(models.Model):
+
+    # region Product Fields from Database.
+    product_id = models.SmallIntegerField(primary_key=True)
+    product_name = models.CharField(max_length=40)
+    supplier = models.ForeignKey(
+        Suppliers, models.DO_NOTHING, blank=True, null=True
+    )
+    category = models.ForeignKey(
+        Categories, models.DO_NOTHING, blank=True, null=True
+    )
+    quantity_per_unit = models.CharField(max_length=20, blank=True, null=True)
+    unit_price = models.FloatField(blank=True, null=True)
+    units_in_stock = models.SmallIntegerField(blank=True, null=True)
+    units_on_order = models.SmallIntegerField(blank=True, null=True)
+    reorder_level = models.SmallIntegerField(blank=True, null=True)
+    discontinued = models.IntegerField()
+
+    class Meta:
+        managed = False
+        db_table = "products"
+
+    # endregion
+
+    def __str__(self):
+        return self.product_name
+
+    def get_recommendations(self):
+        """
+        The products most often bought together with this one, best first.
+        Reads the precomputed ProductRecommendation table (see recommendations.py).
+        """
+        return self.recommendations.select_related("recommended").order_by("rank")
+
+
+class OrderDetails(models.Model):
+
+    # region Order Detail Fields from Database.
+    pk = models.CompositePrimaryKey("order_id", "product_id")
+    order = models.ForeignKey(Orders, models.DO_NOTHING)
+    product = models.ForeignKey(Products, models.DO_NOTHING)
+    unit_price = models.FloatField()
+    quantity = models.SmallIntegerField()
+    discount = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "order_details"
+
+    # endregion
+
+    def __str__(self):
+        return f"Order {self.order_id}: {self.quantity} x {self.product_id}"
+
+
+# region Tables owned by this app (managed by migrations)
+
+
+class CustomerRfmScore(models.Model):
+    """
+    Recency / Frequency / Monetary score for each customer who has ordered.
+    Written by rfm.score_customers() (manage.py score_customers); read by
+    CustomerListView to filter and sort by segment and score.
+
+    Each of r_score, f_score and m_score is a quintile, 1 (worst) to 5 (best).
+    rfm_score is their sum (3 - 15).
+    segment_rank is the segment's position in SEGMENTS, so sorting by it puts
+    the best segment first rather than sorting the names alphabetically.
+    """
+
+    # Segment names, best first (the grid that assigns them is in rfm.py)
+    SEGMENTS = [
+        "Champions",
+        "Loyal",
+        "Potential Loyal",
+        "New",
+        "Promising",
+        "Need Attention",
+        "About to Sleep",
+        "At Risk",
+        "Can't Lose",
+        "Hibernating",
+    ]
+
+    customer = models.OneToOneField(
+        Customers,
+        models.DO_NOTHING,
+        primary_key=True,
+        related_name="rfm",
+    )
+    last_order_date = models.DateField(blank=True, null=True)
+    recency_days = models.IntegerField()
+    frequency = models.IntegerField()
+    monetary = models.FloatField()
+    r_score = models.SmallIntegerField()
+    f_score = models.SmallIntegerField()
+    m_score = models.SmallIntegerField()
+    rfm_score = models.SmallIntegerField(db_index=True)
+    segment = models.CharField(max_length=20)
+    segment_rank = models.SmallIntegerField()
+    scored_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "customer_rfm_scores"
+        indexes = [
+            # Filter by segment, then order by score within it.
+            models.Index(fields=["segment", "-rfm_score"], name="rfm_segment_score_idx"),
+            # Order by segment (best first), then by score within it.
+            models.Index(fields=["segment_rank", "-rfm_score"], name="rfm_rank_score_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.customer_id}: {self.segment} ({self.r_score}{self.f_score}{self.m_score})"
+
+
+class RfmRun(models.Model):
+    """
+    One row per scoring run.
+    last_order_id is the high-water mark used to find customers who ordered since.
+    quantile_edges holds the cut points from the last full run, so an
+    incremental run scores its customers on the same scale.
+    """
+
+    run_at = models.DateTimeField(auto_now_add=True)
+    full = models.BooleanField()
+    last_order_id = models.IntegerField()
+    customers_scored = models.IntegerField()
+    quantile_edges = models.JSONField()
+
+    class Meta:
+        db_table = "rfm_runs"
+        get_latest_by = "pk"
+
+
+class ProductRecommendation(models.Model):
+    """
+    Top-K "frequently bought together" neighbours of each product.
+    Written by recommendations.build_recommendations()
+    (manage.py build_recommendations); rank 1 is the strongest.
+    """
+
+    product = models.ForeignKey(
+        Products, models.DO_NOTHING, related_name="recommendations"
+    )
+    recommended = models.ForeignKey(
+        Products, models.DO_NOTHING, related_name="recommended_for"
+    )
+    rank = models.SmallIntegerField()
+    # Number of orders containing both products.
+    orders_together = models.IntegerField()
+
+    class Meta:
+        db_table = "product_recommendations"
+        constraints = [
+            # Also the index that serves "recommendations for product X".
+            models.UniqueConstraint(fields=["product", "rank"], name="product_rank_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.recommended_id} (#{self.rank})"
+
+
+class RecommendationRun(models.Model):
+    """
+    One row per recommendations build; last_order_id is the high-water mark
+    used to find the products on newer orders.
+    """
+
+    run_at = models.DateTimeField(auto_now_add=True)
+    full = models.BooleanField()
+    last_order_id = models.IntegerField()
+    products_updated = models.IntegerField()
+
+    class Meta:
+        db_table = "recommendation_runs"
+        get_latest_by = "pk"
+
+
+# endregion
@@ -0,0 +1,147 @@
+"""
+"Frequently bought together" product recommendations.
+
+Order lines are read column-wise (order_id, product_id) into NumPy arrays.
+Every pair of products on the same order is expanded with array arithmetic,
+and np.unique counts the pairs into a sparse co-occurrence matrix held as
+(product, neighbour, count) columns. The RECOMMENDATIONS_TOP_K neighbours
+with the highest counts are stored per product in ProductRecommendation, so
+pages read a product's recommendations by index instead of self-joining
+order_details.
+
+A product's row of the matrix only changes when it appears on a new order,
+so an incremental run recomputes just the products on orders above the last
+run's high-water mark, using every order those products appear on.
+"""
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from .models import OrderDetails, Orders, ProductRecommendation, RecommendationRun
+
+DEFAULT_TOP_K = 5
+
+
+def _top_k():
+    return getattr(settings, "RECOMMENDATIONS_TOP_K", DEFAULT_TOP_K)
+
+
+def _order_lines(products=None):
+    """
+    (order_id, product_id) arrays sorted by order. With products given, only
+    the orders that contain at least one of them are read.
+    """
+    lines = OrderDetails.objects.all()
+    if products is not None:
+        lines = lines.filter(
+            order_id__in=OrderDetails.objects.filter(product_id__in=products).values(
+                "order_id"
+            )
+        )
+    rows = np.array(
+        lines.order_by("order_id", "product_id").values_list("order_id", "product_id"),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    return rows[:, 0], rows[:, 1]
+
+
+def co_occurrence(order_ids, product_ids, products=None):
+    """
+    Sparse product x product co-occurrence counts as three arrays
+    (product, neighbour, orders_together), sorted by product, then count
+    (highest first), then neighbour. order_ids must be sorted.
+    Only rows for `products` are built when it is given.
+    """
+    empty = np.array([], dtype=np.int64)
+    if not len(order_ids):
+        return empty, empty, empty
+
+    # Each order is a contiguous run of lines: [start, start + size).
+    _, starts, sizes = np.unique(order_ids, return_index=True, return_counts=True)
+    line_start = np.repeat(starts, sizes)
+    line_size = np.repeat(sizes, sizes)
+
+    # Pair every line with every line of its order (including itself).
+    left = np.repeat(np.arange(len(order_ids)), line_size)
+    first_pair = np.cumsum(line_size) - line_size
+    right = np.repeat(line_start, line_size) + (
+        np.arange(len(left)) - np.repeat(first_pair, line_size)
+    )
+
+    keep = left != right
+    if products is not None:
+        keep &= np.isin(product_ids[left], products)
+    a = product_ids[left[keep]]
+    b = product_ids[right[keep]]
+
+    width = int(product_ids.max()) + 1
+    pairs, counts = np.unique(a * width + b, return_counts=True)
+    a, b = np.divmod(pairs, width)
+
+    order = np.lexsort((b, -counts, a))
+    return a[order], b[order], counts[order]
+
+
+def top_neighbours(a, b, counts, k):
+    """
+    Keep the first k neighbours of each product from co_occurrence() output.
+    Returns (product, neighbour, count, rank) with rank starting at 1.
+    """
+    if not len(a):
+        return a, b, counts, a
+    _, group_starts, group_sizes = np.unique(a, return_index=True, return_counts=True)
+    rank = np.arange(len(a)) - np.repeat(group_starts, group_sizes) + 1
+    keep = rank <= k
+    return a[keep], b[keep], counts[keep], rank[keep]
+
+
+def build_recommendations(full=False):
+    """
+    Refresh ProductRecommendation and return the RecommendationRun recorded.
+    Falls back to a full build when there is no previous run.
+    """
+    last_run = RecommendationRun.objects.order_by("-pk").first()
+    high_water = Orders.objects.aggregate(top=Max("order_id"))["top"] or 0
+
+    if last_run is None:
+        full = True
+
+    if full:
+        products = None
+        order_ids, product_ids = _order_lines()
+    else:
+        products = np.array(
+            OrderDetails.objects.filter(order_id__gt=last_run.last_order_id)
+            .values_list("product_id", flat=True)
+            .distinct(),
+            dtype=np.int64,
+        )
+        order_ids, product_ids = _order_lines(products.tolist())
+
+    a, b, counts, rank = top_neighbours(
+        *co_occurrence(order_ids, product_ids, products), _top_k()
+    )
+
+    recommendations = [
+        ProductRecommendation(
+            product_id=int(a[i]),
+            recommended_id=int(b[i]),
+            orders_together=int(counts[i]),
+            rank=int(rank[i]),
+        )
+        for i in range(len(a))
+    ]
+
+    with transaction.atomic():
+        stale = ProductRecommendation.objects.all()
+        if not full:
+            stale = stale.filter(product_id__in=products.tolist())
+        stale.delete()
+        ProductRecommendation.objects.bulk_create(recommendations, batch_size=1000)
+        return RecommendationRun.objects.create(
+            full=full,
+            last_order_id=high_water,
+            products_updated=len(np.unique(a)),
+        )
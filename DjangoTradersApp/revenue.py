@@ -0,0 +1,188 @@
+"""
+Revenue over time from Orders.order_date and OrderDetails.
+
+Buckets are whole days, ISO weeks (starting Monday), months or quarters.
+The database does the bucketing (Trunc*) and summing in one grouped query.
+
+Long ranges are downsampled: if the requested granularity would return more
+than REVENUE_MAX_POINTS buckets, the next coarser one is used instead, so a
+response never grows past that size.
+
+A bucket that ended before today can no longer change. The closed buckets
+of each (granularity, filters) series are cached together as one entry,
+{bucket_start: revenue}, with no expiry. A request queries only the runs of
+consecutive buckets missing from that entry, plus the bucket holding today
+(the open period), which is always recomputed. Once the history is warm,
+charting ten years costs one cache read and one small query for the
+current period.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncQuarter, TruncWeek
+from django.utils import timezone
+
+from .models import OrderDetails
+
+DEFAULT_MAX_POINTS = 500
+
+# Finest first; downsampling moves right along this list.
+GRANULARITIES = ["day", "week", "month", "quarter"]
+
+TRUNC = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+    "quarter": TruncQuarter,
+}
+
+# Bump to drop every cached bucket (e.g. after correcting historical orders).
+CACHE_PREFIX = "revenue:v1"
+
+
+def _max_points():
+    return getattr(settings, "REVENUE_MAX_POINTS", DEFAULT_MAX_POINTS)
+
+
+# region Bucket arithmetic
+
+
+def bucket_start(day, granularity):
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - datetime.timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+
+
+def next_bucket(start, granularity):
+    if granularity == "day":
+        return start + datetime.timedelta(days=1)
+    if granularity == "week":
+        return start + datetime.timedelta(weeks=1)
+    months = 1 if granularity == "month" else 3
+    month = start.month - 1 + months
+    return start.replace(year=start.year + month // 12, month=month % 12 + 1)
+
+
+def bucket_count(start, end, granularity):
+    """
+    Number of buckets covering [start, end] at this granularity, without
+    enumerating them.
+    """
+    first, last = bucket_start(start, granularity), bucket_start(end, granularity)
+    if granularity == "day":
+        return (last - first).days + 1
+    if granularity == "week":
+        return (last - first).days // 7 + 1
+    months = (last.year - first.year) * 12 + last.month - first.month
+    return months // (1 if granularity == "month" else 3) + 1
+
+
+def buckets(start, end, granularity):
+    current = bucket_start(start, granularity)
+    while current <= end:
+        yield current
+        current = next_bucket(current, granularity)
+
+
+# endregion Bucket arithmetic
+
+
+def choose_granularity(start, end, granularity):
+    """
+    The requested granularity, or the finest coarser one that keeps the
+    series within REVENUE_MAX_POINTS buckets.
+    """
+    for candidate in GRANULARITIES[GRANULARITIES.index(granularity):]:
+        if bucket_count(start, end, candidate) <= _max_points():
+            return candidate
+    raise ValueError("Date range is too long to chart.")
+
+
+def _query_buckets(first, stop, granularity, filters):
+    """
+    {bucket_start: revenue} for orders dated in [first, stop), one grouped query.
+    """
+    lines = OrderDetails.objects.filter(
+        order__order_date__gte=first, order__order_date__lt=stop, **filters
+    )
+    rows = (
+        lines.annotate(bucket=TRUNC[granularity]("order__order_date"))
+        .values("bucket")
+        .annotate(revenue=Sum(F("unit_price") * F("quantity") * (1 - F("discount"))))
+        .order_by()
+        .values_list("bucket", "revenue")
+    )
+    return {bucket: revenue for bucket, revenue in rows}
+
+
+def _missing_runs(periods, granularity):
+    """
+    Split sorted bucket starts into runs of consecutive buckets, as
+    [(first, stop), ...] ranges that can each be read with one query.
+    """
+    runs = []
+    for period in periods:
+        if runs and runs[-1][1] == period:
+            runs[-1][1] = next_bucket(period, granularity)
+        else:
+            runs.append([period, next_bucket(period, granularity)])
+    return [tuple(run) for run in runs]
+
+
+def revenue_series(granularity, start, end, customer=None, product=None, employee=None):
+    """
+    Returns {"granularity", "start", "end", "points": [{"period", "revenue"}]}.
+    start / end are widened to whole buckets so every bucket is complete.
+    """
+    if start > end:
+        raise ValueError("start must not be after end.")
+    granularity = choose_granularity(start, end, granularity)
+
+    filters = {}
+    if customer:
+        filters["order__customer_id"] = customer
+    if product:
+        filters["product_id"] = product
+    if employee:
+        filters["order__employee_id"] = employee
+
+    periods = list(buckets(start, end, granularity))
+    today = timezone.localdate()
+    key = f"{CACHE_PREFIX}:{granularity}:{customer or '*'}:{product or '*'}:{employee or '*'}"
+
+    # Closed buckets of this series computed so far; they never change again.
+    history = cache.get(key) or {}
+    totals = {period: history[period] for period in periods if period in history}
+
+    missing = [period for period in periods if period not in totals]
+    if missing:
+        queried = {}
+        for first, stop in _missing_runs(missing, granularity):
+            queried.update(_query_buckets(first, stop, granularity, filters))
+        fresh = {period: float(queried.get(period) or 0) for period in missing}
+        totals.update(fresh)
+
+        closed = {
+            period: total
+            for period, total in fresh.items()
+            if next_bucket(period, granularity) <= today
+        }
+        if closed:
+            cache.set(key, {**history, **closed}, timeout=None)
+
+    return {
+        "granularity": granularity,
+        "start": periods[0].isoformat(),
+        "end": (next_bucket(periods[-1], granularity) - datetime.timedelta(days=1)).isoformat(),
+        "points": [
+            {"period": period.isoformat(), "revenue": round(totals[period], 2)}
+            for period in periods
+        ],
+    }
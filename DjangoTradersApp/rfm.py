@@ -0,0 +1,189 @@
+"""
+RFM (recency, frequency, monetary) customer scoring.
+
+One grouped query over OrderDetails returns a row per customer; the rows go
+straight into NumPy arrays and every customer is scored in a few vectorised
+operations:
+
+    recency   days since the customer's last order   (fewer is better)
+    frequency number of distinct orders
+    monetary  sum of unit_price * quantity * (1 - discount)
+
+Each measure is cut into quintiles (1 - 5). The R and F scores pick the
+segment from SEGMENT_GRID. Results are upserted into CustomerRfmScore.
+
+A full run recomputes the quintile edges and rescores everyone. An
+incremental run rescores only customers with orders newer than the last
+run's high-water mark, against the edges stored by the last full run.
+"""
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, F, Max, Sum
+from django.utils import timezone
+
+from .models import CustomerRfmScore, OrderDetails, Orders, RfmRun
+
+QUANTILES = [0.2, 0.4, 0.6, 0.8]
+
+# SEGMENT_GRID[r_score - 1][f_score - 1]
+SEGMENT_GRID = np.array(
+    [
+        # F: 1             2                3                4                5
+        ["Hibernating", "Hibernating", "At Risk", "At Risk", "Can't Lose"],  # R 1
+        ["Hibernating", "Hibernating", "At Risk", "At Risk", "Can't Lose"],  # R 2
+        ["About to Sleep", "About to Sleep", "Need Attention", "Loyal", "Loyal"],  # R 3
+        ["Promising", "Potential Loyal", "Potential Loyal", "Loyal", "Loyal"],  # R 4
+        ["New", "Potential Loyal", "Potential Loyal", "Champions", "Champions"],  # R 5
+    ],
+    dtype=object,
+)
+
+# Position of each SEGMENT_GRID cell in CustomerRfmScore.SEGMENTS (0 = best)
+SEGMENT_RANK_GRID = np.array(
+    [[CustomerRfmScore.SEGMENTS.index(name) for name in row] for row in SEGMENT_GRID]
+)
+
+
+def _customer_totals(customer_ids=None):
+    """
+    One grouped query: (customer_id, last order date, order count, revenue)
+    per customer, loaded column-wise into NumPy arrays.
+    """
+    rows = OrderDetails.objects.filter(order__customer__isnull=False)
+    if customer_ids is not None:
+        rows = rows.filter(order__customer_id__in=customer_ids)
+
+    rows = (
+        rows.values("order__customer_id")
+        .annotate(
+            last_order=Max("order__order_date"),
+            frequency=Count("order_id", distinct=True),
+            monetary=Sum(F("unit_price") * F("quantity") * (1 - F("discount"))),
+        )
+        .order_by()
+        .values_list("order__customer_id", "last_order", "frequency", "monetary")
+    )
+
+    customer_ids, last_orders, frequency, monetary = (
+        zip(*rows) if rows else ((), (), (), ())
+    )
+    return (
+        np.array(customer_ids, dtype=object),
+        np.array(last_orders, dtype="datetime64[D]"),
+        np.array(frequency, dtype=np.int64),
+        np.array(monetary, dtype=np.float64),
+    )
+
+
+def _quintile_edges(values):
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return [0.0] * len(QUANTILES)
+    return np.quantile(values, QUANTILES).tolist()
+
+
+def _quintile_scores(values, edges):
+    """
+    1 for the lowest fifth ... 5 for the highest, against the given cut points.
+    A value equal to a cut point goes in the lower quintile (like pandas.qcut),
+    so tied values such as one-order customers are not pushed up a score.
+    """
+    return np.searchsorted(np.asarray(edges), values, side="left") + 1
+
+
+def score_customers(full=False):
+    """
+    Score customers and store the results. Returns the RfmRun recorded.
+    Falls back to a full run when no full run has been stored yet.
+    """
+    last_full = RfmRun.objects.filter(full=True).order_by("-pk").first()
+    last_run = RfmRun.objects.order_by("-pk").first()
+    high_water = Orders.objects.aggregate(top=Max("order_id"))["top"] or 0
+
+    if last_full is None:
+        full = True
+
+    if full:
+        customer_ids, last_orders, frequency, monetary = _customer_totals()
+    else:
+        changed = (
+            Orders.objects.filter(
+                order_id__gt=last_run.last_order_id, customer__isnull=False
+            )
+            .values_list("customer_id", flat=True)
+            .distinct()
+        )
+        customer_ids, last_orders, frequency, monetary = _customer_totals(
+            list(changed)
+        )
+
+    today = np.datetime64(timezone.localdate(), "D")
+    # Customers whose orders have no date are treated as the least recent.
+    recency = (today - last_orders).astype(np.float64)
+    recency[np.isnat(last_orders)] = np.inf
+
+    if full:
+        edges = {
+            "recency": _quintile_edges(recency),
+            "frequency": _quintile_edges(frequency),
+            "monetary": _quintile_edges(monetary),
+        }
+    else:
+        edges = last_full.quantile_edges
+
+    # Fewer days since the last order is better, so recency is scored in reverse.
+    r_score = 6 - _quintile_scores(recency, edges["recency"])
+    f_score = _quintile_scores(frequency, edges["frequency"])
+    m_score = _quintile_scores(monetary, edges["monetary"])
+    segment = SEGMENT_GRID[r_score - 1, f_score - 1]
+    segment_rank = SEGMENT_RANK_GRID[r_score - 1, f_score - 1]
+
+    scored_at = timezone.now()
+    scores = [
+        CustomerRfmScore(
+            customer_id=customer_ids[i],
+            last_order_date=None if np.isnat(last_orders[i]) else last_orders[i].item(),
+            recency_days=int(min(recency[i], 2**31 - 1)),
+            frequency=int(frequency[i]),
+            monetary=float(monetary[i]),
+            r_score=int(r_score[i]),
+            f_score=int(f_score[i]),
+            m_score=int(m_score[i]),
+            rfm_score=int(r_score[i] + f_score[i] + m_score[i]),
+            segment=segment[i],
+            segment_rank=int(segment_rank[i]),
+            scored_at=scored_at,
+        )
+        for i in range(len(customer_ids))
+    ]
+
+    with transaction.atomic():
+        if full:
+            # Also drops customers whose orders have since been removed.
+            CustomerRfmScore.objects.all().delete()
+        CustomerRfmScore.objects.bulk_create(
+            scores,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["customer"],
+            update_fields=[
+                "last_order_date",
+                "recency_days",
+                "frequency",
+                "monetary",
+                "r_score",
+                "f_score",
+                "m_score",
+                "rfm_score",
+                "segment",
+                "segment_rank",
+                "scored_at",
+            ],
+        )
+        return RfmRun.objects.create(
+            full=full,
+            last_order_id=high_water,
+            customers_scored=len(scores),
+            quantile_edges=edges,
+        )
@@ -0,0 +1,127 @@
+"""
+Signal handlers that keep the in-memory aggregates in step with model writes.
+Connected in DjangotradersappConfig.ready().
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .geoAggregates import customer_location, geo_aggregates, order_location
+from .models import Customers, Orders
+
+
+# region Geo aggregates
+
+# Marks a save that cannot have changed the location (the location fields
+# were deferred or left out of update_fields), so no delta is needed.
+UNCHANGED = object()
+
+
+def _location_before_save(sender, instance, update_fields, location_fields):
+    """
+    Read the stored location of a row that is about to be updated, so the
+    save can tell whether it moved. Only writes pay for this query; loading
+    instances does no location bookkeeping at all.
+    """
+    if instance._state.adding:
+        # A new row has no old location (see post_save for the update case).
+        instance._geo_location = None
+    elif set(instance.get_deferred_fields()) & set(location_fields) or (
+        update_fields is not None and not set(update_fields) & set(location_fields)
+    ):
+        instance._geo_location = UNCHANGED
+    else:
+        instance._geo_location = (
+            sender._base_manager.filter(pk=instance.pk)
+            .values_list(*location_fields)
+            .first()
+        )
+
+
+def _location_saved(instance, created, get_location, add, remove):
+    """
+    Deltas are applied on commit so a rolled-back write leaves the counts alone.
+    """
+    old_location = instance.__dict__.pop("_geo_location", None)
+
+    if created:
+        transaction.on_commit(partial(add, get_location(instance)))
+    elif old_location is UNCHANGED:
+        pass
+    elif old_location is None:
+        # An unsaved instance that updated an existing row, or a row that was
+        # missing before the save; either way there is no delta to apply.
+        transaction.on_commit(geo_aggregates.invalidate)
+    else:
+        new_location = get_location(instance)
+        if old_location != new_location:
+            transaction.on_commit(partial(remove, old_location))
+            transaction.on_commit(partial(add, new_location))
+
+
+def _location_deleted(instance, location_fields, get_location, remove):
+    if set(instance.get_deferred_fields()) & set(location_fields):
+        # The row is gone, so the deferred fields cannot be loaded any more.
+        transaction.on_commit(geo_aggregates.invalidate)
+    else:
+        transaction.on_commit(partial(remove, get_location(instance)))
+
+
+# In customer_location / order_location order.
+CUSTOMER_LOCATION_FIELDS = ("country", "region", "city")
+ORDER_LOCATION_FIELDS = ("ship_country", "ship_region", "ship_city")
+
+
+@receiver(pre_save, sender=Customers)
+def customer_saving(sender, instance, update_fields, **kwargs):
+    _location_before_save(sender, instance, update_fields, CUSTOMER_LOCATION_FIELDS)
+
+
+@receiver(post_save, sender=Customers)
+def customer_saved(sender, instance, created, **kwargs):
+    _location_saved(
+        instance,
+        created,
+        customer_location,
+        geo_aggregates.add_customer,
+        geo_aggregates.remove_customer,
+    )
+
+
+@receiver(post_delete, sender=Customers)
+def customer_deleted(sender, instance, **kwargs):
+    _location_deleted(
+        instance,
+        CUSTOMER_LOCATION_FIELDS,
+        customer_location,
+        geo_aggregates.remove_customer,
+    )
+
+
+@receiver(pre_save, sender=Orders)
+def order_saving(sender, instance, update_fields, **kwargs):
+    _location_before_save(sender, instance, update_fields, ORDER_LOCATION_FIELDS)
+
+
+@receiver(post_save, sender=Orders)
+def order_saved(sender, instance, created, **kwargs):
+    _location_saved(
+        instance,
+        created,
+        order_location,
+        geo_aggregates.add_order,
+        geo_aggregates.remove_order,
+    )
+
+
+@receiver(post_delete, sender=Orders)
+def order_deleted(sender, instance, **kwargs):
+    _location_deleted(
+        instance, ORDER_LOCATION_FIELDS, order_location, geo_aggregates.remove_order
+    )
+
+
+# endregion Geo aggregates
@@ -0,0 +1,68 @@
+"""
+Streaming page rendering for long lists.
+
+A normal render() builds the whole page in memory before the first byte is
+sent. stream_template() instead renders the page once with a marker where the
+rows go, sends everything before the marker straight away, renders the rows in
+chunks while iterating the queryset with a server-side cursor, then sends the
+rest of the page.
+"""
+
+from itertools import islice
+
+from django.core.exceptions import ImproperlyConfigured
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template
+
+# Placeholder the page template outputs in place of its rows.
+# Plain characters only, so autoescaping leaves it untouched.
+ROWS_MARKER = "__DJANGO_TRADERS_STREAM_ROWS__"
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def stream_template(
+    request,
+    template_name,
+    rows_template_name,
+    queryset,
+    context=None,
+    rows_context_name="object_list",
+    chunk_size=DEFAULT_CHUNK_SIZE,
+):
+    """
+    Returns a StreamingHttpResponse for template_name.
+
+    template_name must output {{ stream_rows_marker }} where the rows belong.
+    rows_template_name renders one chunk of rows, found in the context
+    under rows_context_name; it is also rendered once with an empty list
+    when the queryset has no rows, so its {% empty %} branch still shows.
+    """
+    page_context = dict(context or {})
+    page_context["stream_rows_marker"] = ROWS_MARKER
+    page = get_template(template_name).render(page_context, request)
+    if ROWS_MARKER not in page:
+        raise ImproperlyConfigured(
+            f"{template_name} must output {{{{ stream_rows_marker }}}} to be streamed."
+        )
+    head, tail = page.split(ROWS_MARKER, 1)
+
+    rows_template = get_template(rows_template_name)
+
+    def render_rows():
+        # .iterator() does not cache results and, on PostgreSQL, reads through a
+        # server-side cursor - only chunk_size rows are held at any time.
+        rows = queryset.iterator(chunk_size=chunk_size)
+        any_rows = False
+        while chunk := list(islice(rows, chunk_size)):
+            any_rows = True
+            yield rows_template.render({rows_context_name: chunk})
+        if not any_rows:
+            yield rows_template.render({rows_context_name: []})
+
+    def render_page():
+        yield head
+        yield from render_rows()
+        yield tail
+
+    return StreamingHttpResponse(render_page())
@@ -0,0 +1,36 @@
+"""
+Test runner for the Northwind tables.
+
+Customers, Orders, Products and the rest are managed = False: the real
+tables belong to the Northwind database, so migrations never create them.
+The test database is empty, though, so this runner marks those models as
+managed and builds the app's tables straight from the models (no migrations)
+for the length of the test run.
+"""
+
+from django.apps import apps
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class NorthwindTestRunner(DiscoverRunner):
+    def setup_databases(self, **kwargs):
+        self._unmanaged = [
+            model
+            for model in apps.get_app_config("DjangoTradersApp").get_models()
+            if not model._meta.managed
+        ]
+        for model in self._unmanaged:
+            model._meta.managed = True
+
+        self._no_migrations = override_settings(
+            MIGRATION_MODULES={"DjangoTradersApp": None}
+        )
+        self._no_migrations.enable()
+        return super().setup_databases(**kwargs)
+
+    def teardown_databases(self, old_config, **kwargs):
+        super().teardown_databases(old_config, **kwargs)
+        self._no_migrations.disable()
+        for model in self._unmanaged:
+            model._meta.managed = False
@@ -1,3 +1,739 @@
-from django.test import TestCase
+import datetime
+import io
+import itertools
+import os
+import re
+import tempfile
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .geoAggregates import GeoAggregates, geo_aggregates
+from .management.commands import bench_startup
+from .management.commands.build_assets import minify_css, rebase_css_urls
+from .models import (
+    CustomerRfmScore,
+    Customers,
+    OrderDetails,
+    Orders,
+    ProductRecommendation,
+    Products,
+    RfmRun,
+)
+from .recommendations import build_recommendations, co_occurrence, top_neighbours
+from .revenue import (
+    bucket_count,
+    bucket_start,
+    buckets,
+    choose_granularity,
+    next_bucket,
+    revenue_series,
+)
+from .rfm import SEGMENT_GRID, _quintile_edges, _quintile_scores, score_customers
+from .streaming import stream_template
+from .views import CustomerListView
+
 
 # Create your tests here.
+
+
+def make_customer(customer_id, country, region, city):
+    return Customers.objects.create(
+        customer_id=customer_id,
+        company_name=f"Company {customer_id}",
+        country=country,
+        region=region,
+        city=city,
+    )
+
+
+def make_order(order_id, customer, country, region, city, order_date=None):
+    return Orders.objects.create(
+        order_id=order_id,
+        customer=customer,
+        order_date=order_date,
+        ship_country=country,
+        ship_region=region,
+        ship_city=city,
+    )
+
+
+def make_product(product_id):
+    return Products.objects.create(
+        product_id=product_id, product_name=f"Product {product_id}", discontinued=0
+    )
+
+
+def make_line(order, product, unit_price=10.0, quantity=1, discount=0.0):
+    return OrderDetails.objects.create(
+        order=order,
+        product=product,
+        unit_price=unit_price,
+        quantity=quantity,
+        discount=discount,
+    )
+
+
+# region Static assets
+
+
+class BuildAssetsTests(SimpleTestCase):
+    def test_relative_url_rebased_into_bundle(self):
+        css = "@font-face{src:url(../webfonts/fa-solid-900.woff2)}"
+        self.assertEqual(
+            rebase_css_urls(
+                css, "vendor/fontawesome/css/solid.min.css", "bundles/site.css"
+            ),
+            "@font-face{src:url(../vendor/fontawesome/webfonts/fa-solid-900.woff2)}",
+        )
+        self.assertEqual(
+            rebase_css_urls('a{b:url("img/x.png")}', "css/styles.css", "bundles/site.css"),
+            "a{b:url(../css/img/x.png)}",
+        )
+
+    def test_data_and_absolute_urls_unchanged(self):
+        for url in (
+            "url(data:image/svg+xml;base64,PHN2Zz4=)",
+            "url(/static/images/favicon.ico)",
+            "url(https://example.com/font.woff2)",
+            "url(#gradient)",
+        ):
+            css = f"a{{b:{url}}}"
+            self.assertEqual(
+                rebase_css_urls(css, "vendor/bootstrap/css/bootstrap.css", "bundles/site.css"),
+                css,
+            )
+
+    def test_minify_keeps_licence_comments(self):
+        css = "/*! Licence v1 */\n/* note */\nbody {\n  color : red ;\n  margin: 0;\n}\n"
+        self.assertEqual(minify_css(css), "/*! Licence v1 */ body{color : red;margin: 0}")
+
+    def test_check_fails_on_stale_bundle(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            (root / "css").mkdir()
+            (root / "css" / "styles.css").write_text("body { color: red; }\n")
+            bundles = {"bundles/site.css": ["css/styles.css"]}
+
+            with override_settings(ASSET_SOURCE_DIR=root, ASSET_BUNDLES=bundles):
+                with self.assertRaisesMessage(CommandError, "bundles/site.css"):
+                    call_command("build_assets", check=True)
+
+                call_command("build_assets", stdout=io.StringIO())
+                self.assertEqual(
+                    (root / "bundles" / "site.css").read_text(), "body{color: red}\n"
+                )
+                call_command("build_assets", check=True)
+
+                (root / "css" / "styles.css").write_text("body { color: blue; }\n")
+                with self.assertRaisesMessage(CommandError, "bundles/site.css"):
+                    call_command("build_assets", check=True)
+
+
+# endregion Static assets
+
+
+# region Settings profiles
+
+
+class BenchStartupTests(SimpleTestCase):
+    def test_prod_worker_skips_forbidden_modules(self):
+        # A fresh prod worker, started the way `bench_startup` starts one.
+        with mock.patch.dict(
+            os.environ, {"DJANGO_SETTINGS_MODULE": "DjangoProject.settings"}
+        ):
+            worker = bench_startup.Command().start_worker("prod")
+
+        self.assertIn("DjangoTradersApp.views", worker["modules"])
+        self.assertEqual(bench_startup.forbidden_imports(worker["modules"]), [])
+
+    def test_forbidden_imports(self):
+        modules = ["django.contrib.staticfiles", "django.contrib.sessions", "numpy"]
+        self.assertEqual(
+            bench_startup.forbidden_imports(modules), ["django.contrib.sessions", "numpy"]
+        )
+
+
+# endregion Settings profiles
+
+
+# region Geo aggregates
+
+
+def geo_tree(aggregates, *path):
+    """
+    The whole tree below path as nested dicts, for comparing two GeoAggregates.
+    """
+    summary = aggregates.summary(*path)
+    if summary is None:
+        return None
+    return {
+        "customers": summary["customers"],
+        "orders": summary["orders"],
+        "children": {
+            child["name"]: geo_tree(aggregates, *path, child["name"])
+            if len(path) < 2
+            else (child["customers"], child["orders"])
+            for child in summary["children"]
+        },
+    }
+
+
+class GeoAggregatesSignalTests(TestCase):
+    """
+    After every write, the incrementally updated geo_aggregates must match a
+    GeoAggregates freshly built from the database.
+    """
+
+    def setUp(self):
+        self.alfki = make_customer("ALFKI", "Germany", None, "Berlin")
+        self.bonap = make_customer("BONAP", "France", None, "Marseille")
+        make_order(1, self.alfki, "Germany", None, "Berlin")
+        make_order(2, self.bonap, "France", None, "Marseille")
+
+        geo_aggregates.invalidate()
+        geo_aggregates.summary()  # build, so later writes are applied as deltas
+
+    def assertMatchesDatabase(self):
+        self.assertIsNotNone(geo_aggregates._root, "tree was invalidated")
+        self.assertEqual(geo_tree(geo_aggregates), geo_tree(GeoAggregates()))
+
+    def test_create(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            customer = make_customer("LIMAP", "Peru", None, "Lima")
+            make_order(3, customer, "Peru", None, "Lima")
+
+        self.assertMatchesDatabase()
+        self.assertEqual(geo_aggregates.summary("Peru")["customers"], 1)
+        self.assertEqual(geo_aggregates.summary("Peru")["orders"], 1)
+
+    def test_move(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            customer = Customers.objects.get(pk="ALFKI")
+            customer.country, customer.region, customer.city = "USA", "WA", "Seattle"
+            customer.save()
+
+        self.assertMatchesDatabase()
+        self.assertEqual(geo_aggregates.summary("USA", "WA")["customers"], 1)
+        # Germany keeps its order, so it stays with no customers.
+        self.assertEqual(geo_aggregates.summary("Germany")["customers"], 0)
+
+    def test_save_with_deferred_location_keeps_counts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            customer = Customers.objects.only("company_name").get(pk="ALFKI")
+            customer.company_name = "Renamed"
+            # Only the UPDATE: the location was not saved, so it is not read.
+            with self.assertNumQueries(1):
+                customer.save()
+
+        self.assertMatchesDatabase()
+
+    def test_save_without_location_fields_reads_nothing(self):
+        customer = Customers.objects.get(pk="ALFKI")
+        customer.company_name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(1):
+                customer.save(update_fields=["company_name"])
+
+        self.assertMatchesDatabase()
+
+    def test_loading_does_no_location_bookkeeping(self):
+        customer = Customers.objects.get(pk="ALFKI")
+        self.assertNotIn("_geo_location", customer.__dict__)
+
+    def test_unsaved_instance_over_existing_row_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Customers(
+                customer_id="ALFKI", company_name="Moved", country="Peru", city="Lima"
+            ).save()
+
+        self.assertIsNone(geo_aggregates._root)
+        self.assertEqual(geo_tree(geo_aggregates), geo_tree(GeoAggregates()))
+
+    def test_rollback_applies_no_delta(self):
+        before = geo_tree(geo_aggregates)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    make_customer("LIMAP", "Peru", None, "Lima")
+                    Customers.objects.get(pk="BONAP").delete()
+                    raise RuntimeError("roll back")
+            except RuntimeError:
+                pass
+
+        self.assertEqual(geo_tree(geo_aggregates), before)
+        self.assertMatchesDatabase()
+
+    def test_delete_prunes_empty_places(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            customer = make_customer("LIMAP", "Peru", None, "Lima")
+        with self.captureOnCommitCallbacks(execute=True):
+            customer.delete()
+
+        self.assertMatchesDatabase()
+        self.assertIsNone(geo_aggregates.summary("Peru"))
+
+    def test_remove_below_zero_invalidates(self):
+        # Peru/Lima exists only because of an order; a stray customer removal
+        # must not leave customers = -1 behind.
+        with self.captureOnCommitCallbacks(execute=True):
+            make_order(3, None, "Peru", None, "Lima")
+
+        geo_aggregates.remove_customer(("Peru", None, "Lima"))
+
+        self.assertIsNone(geo_aggregates._root)
+        self.assertEqual(geo_aggregates.summary("Peru")["customers"], 0)
+
+
+# endregion Geo aggregates
+
+
+# region Streaming
+
+
+class StreamingCustomersListTests(TestCase):
+    def setUp(self):
+        for i in range(200):
+            make_customer(f"C{i:04d}", "Germany", None, "Berlin")
+
+    def test_streamed_page_matches_render(self):
+        streamed = self.client.get("/customers/")
+        rendered = self.client.get("/customers/?stream=0")
+
+        self.assertTrue(streamed.streaming)
+        self.assertFalse(rendered.streaming)
+
+        def normalize(html):
+            return re.sub(r"\s+", " ", html).strip()
+
+        streamed_html = normalize(b"".join(streamed.streaming_content).decode())
+        rendered_html = normalize(rendered.content.decode())
+        self.assertEqual(streamed_html, rendered_html)
+        self.assertEqual(streamed_html.count('<li class="list-item'), 200)
+
+    def test_template_without_marker_is_rejected(self):
+        request = RequestFactory().get("/")
+        with self.assertRaisesMessage(ImproperlyConfigured, "DjangoTradersApp/welcome.html"):
+            stream_template(
+                request,
+                "DjangoTradersApp/welcome.html",
+                "DjangoTradersApp/Customers/ListRows.html",
+                Customers.objects.all(),
+            )
+
+
+# endregion Streaming
+
+
+# region RFM
+
+
+class RfmScoringTests(TestCase):
+    def test_quintile_scores(self):
+        edges = [10, 20, 30, 40]
+        values = np.array([0, 10, 15, 20, 39.9, 40, 1000])
+        # Values equal to an edge go to the lower quintile.
+        self.assertEqual(_quintile_scores(values, edges).tolist(), [1, 1, 2, 2, 4, 4, 5])
+
+    def test_tied_values_stay_in_the_lowest_quintile(self):
+        values = np.array([1, 1, 1, 1, 10])
+        edges = _quintile_edges(values)
+        np.testing.assert_allclose(edges, [1.0, 1.0, 1.0, 2.8])
+        # Frequency: four one-order customers score 1, not 4.
+        self.assertEqual(_quintile_scores(values, edges).tolist(), [1, 1, 1, 1, 5])
+        # Recency: the four most recent customers score R = 5, not 2.
+        self.assertEqual((6 - _quintile_scores(values, edges)).tolist(), [5, 5, 5, 5, 1])
+
+    def test_no_order_date_is_least_recent(self):
+        recency = np.array([1.0, 50.0, np.inf])
+        r_score = 6 - _quintile_scores(recency, [10, 20, 30, 40])
+        self.assertEqual(r_score.tolist(), [5, 1, 1])
+
+    def test_segment_grid(self):
+        r_score = np.array([5, 5, 1, 1, 3, 4])
+        f_score = np.array([5, 1, 5, 1, 3, 1])
+        self.assertEqual(
+            SEGMENT_GRID[r_score - 1, f_score - 1].tolist(),
+            ["Champions", "New", "Can't Lose", "Hibernating", "Need Attention", "Promising"],
+        )
+        self.assertLessEqual(set(SEGMENT_GRID.flat), set(CustomerRfmScore.SEGMENTS))
+
+    def test_incremental_run_rescores_only_new_orders(self):
+        product = make_product(1)
+        today = timezone.localdate()
+        customers = [
+            make_customer(f"C{i:04d}", "Germany", None, "Berlin") for i in range(10)
+        ]
+        order_id = 0
+        for i, customer in enumerate(customers):
+            for _ in range(i + 1):
+                order_id += 1
+                order = make_order(
+                    order_id,
+                    customer,
+                    "Germany",
+                    None,
+                    "Berlin",
+                    order_date=today - datetime.timedelta(days=10 * (10 - i)),
+                )
+                make_line(order, product, unit_price=10.0 * (i + 1))
+
+        full_run = score_customers(full=True)
+        self.assertEqual(full_run.customers_scored, 10)
+        before = {score.pk: score for score in CustomerRfmScore.objects.all()}
+
+        # The least active customer orders again, today and for a lot.
+        order_id += 1
+        order = make_order(order_id, customers[0], "Germany", None, "Berlin", order_date=today)
+        make_line(order, product, unit_price=10_000.0)
+
+        run = score_customers()
+
+        self.assertFalse(run.full)
+        self.assertEqual(run.customers_scored, 1)
+        self.assertEqual(run.last_order_id, order_id)
+        self.assertEqual(run.quantile_edges, full_run.quantile_edges)
+
+        after = {score.pk: score for score in CustomerRfmScore.objects.all()}
+        for customer in customers[1:]:
+            self.assertEqual(after[customer.pk].scored_at, before[customer.pk].scored_at)
+
+        rescored = after[customers[0].pk]
+        edges = full_run.quantile_edges
+        self.assertGreater(rescored.scored_at, before[customers[0].pk].scored_at)
+        self.assertEqual(rescored.frequency, 2)
+        self.assertEqual(rescored.r_score, 6 - _quintile_scores(0.0, edges["recency"]))
+        self.assertEqual(rescored.f_score, _quintile_scores(2, edges["frequency"]))
+        self.assertEqual(rescored.m_score, _quintile_scores(10_010.0, edges["monetary"]))
+        self.assertEqual(
+            rescored.segment, SEGMENT_GRID[rescored.r_score - 1, rescored.f_score - 1]
+        )
+        self.assertEqual(
+            rescored.segment_rank, CustomerRfmScore.SEGMENTS.index(rescored.segment)
+        )
+
+        # Nothing new since: an incremental run scores nobody.
+        self.assertEqual(score_customers().customers_scored, 0)
+        self.assertEqual(RfmRun.objects.count(), 3)
+
+    def test_sort_by_segment_puts_best_segment_first(self):
+        scored_at = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+        for customer_id, segment, rfm_score in [
+            ("AAAAA", "Hibernating", 3),
+            ("BBBBB", "Champions", 14),
+            ("CCCCC", "At Risk", 7),
+            ("DDDDD", "Champions", 15),
+        ]:
+            customer = make_customer(customer_id, "Germany", None, "Berlin")
+            CustomerRfmScore.objects.create(
+                customer=customer,
+                recency_days=0,
+                frequency=1,
+                monetary=1.0,
+                r_score=1,
+                f_score=1,
+                m_score=1,
+                rfm_score=rfm_score,
+                segment=segment,
+                segment_rank=CustomerRfmScore.SEGMENTS.index(segment),
+                scored_at=scored_at,
+            )
+
+        def customer_ids(query):
+            view = CustomerListView()
+            view.setup(RequestFactory().get("/customers/list", query))
+            return [customer.pk for customer in view.get_queryset()]
+
+        self.assertEqual(
+            customer_ids({"sort": "segment"}), ["DDDDD", "BBBBB", "CCCCC", "AAAAA"]
+        )
+        self.assertEqual(
+            customer_ids({"sort": "segment", "order": "desc"}),
+            ["AAAAA", "CCCCC", "BBBBB", "DDDDD"],
+        )
+        self.assertEqual(
+            customer_ids({"sort": "segment", "segment": "Champions"}), ["DDDDD", "BBBBB"]
+        )
+
+
+# endregion RFM
+
+
+# region Recommendations
+
+
+def brute_force_co_occurrence(baskets):
+    """
+    {(product, neighbour): orders_together} counted pair by pair.
+    """
+    counts = Counter()
+    for basket in baskets.values():
+        counts.update(itertools.permutations(sorted(set(basket)), 2))
+    return counts
+
+
+class RecommendationTests(TestCase):
+    # order_id -> products on that order
+    BASKETS = {
+        1: [1, 2, 3],
+        2: [1, 2],
+        3: [2, 3, 4],
+        4: [5],
+        5: [1, 2, 3, 4, 5, 6],
+        6: [6, 1],
+    }
+
+    def order_lines(self, baskets):
+        lines = sorted(
+            (order_id, product)
+            for order_id, basket in baskets.items()
+            for product in basket
+        )
+        order_ids, product_ids = zip(*lines)
+        return np.array(order_ids), np.array(product_ids)
+
+    def make_baskets(self, baskets):
+        customer = make_customer("ALFKI", "Germany", None, "Berlin")
+        products = {}
+        for order_id, basket in baskets.items():
+            order = make_order(order_id, customer, "Germany", None, "Berlin")
+            for product_id in basket:
+                if product_id not in products:
+                    products[product_id] = make_product(product_id)
+                make_line(order, products[product_id])
+        return customer
+
+    def stored_recommendations(self):
+        return list(
+            ProductRecommendation.objects.order_by("product_id", "rank").values_list(
+                "product_id", "recommended_id", "orders_together", "rank"
+            )
+        )
+
+    def test_co_occurrence_matches_brute_force(self):
+        a, b, counts = co_occurrence(*self.order_lines(self.BASKETS))
+
+        self.assertEqual(
+            dict(zip(zip(a.tolist(), b.tolist()), counts.tolist())),
+            brute_force_co_occurrence(self.BASKETS),
+        )
+        # Sorted by product, then count (highest first), then neighbour.
+        rows = list(zip(a.tolist(), (-counts).tolist(), b.tolist()))
+        self.assertEqual(rows, sorted(rows))
+
+    def test_co_occurrence_for_some_products(self):
+        a, b, counts = co_occurrence(*self.order_lines(self.BASKETS), products=[2, 6])
+
+        expected = {
+            pair: count
+            for pair, count in brute_force_co_occurrence(self.BASKETS).items()
+            if pair[0] in (2, 6)
+        }
+        self.assertEqual(dict(zip(zip(a.tolist(), b.tolist()), counts.tolist())), expected)
+
+    def test_top_neighbours_cutoff(self):
+        a, b, counts = co_occurrence(*self.order_lines(self.BASKETS))
+        brute_force = brute_force_co_occurrence(self.BASKETS)
+
+        for k in (1, 2, 10):
+            top_a, top_b, top_counts, rank = top_neighbours(a, b, counts, k)
+            for product in range(1, 7):
+                expected = sorted(
+                    (-count, neighbour)
+                    for (left, neighbour), count in brute_force.items()
+                    if left == product
+                )[:k]
+                mask = top_a == product
+                self.assertEqual(
+                    list(zip((-top_counts[mask]).tolist(), top_b[mask].tolist())), expected
+                )
+                self.assertEqual(rank[mask].tolist(), list(range(1, len(expected) + 1)))
+
+    @override_settings(RECOMMENDATIONS_TOP_K=2)
+    def test_incremental_build_matches_full_build(self):
+        first = dict(list(self.BASKETS.items())[:3])
+        customer = self.make_baskets(first)
+        build_recommendations(full=True)
+
+        products = {product.pk: product for product in Products.objects.all()}
+        for order_id, basket in list(self.BASKETS.items())[3:]:
+            order = make_order(order_id, customer, "Germany", None, "Berlin")
+            for product_id in basket:
+                if product_id not in products:
+                    products[product_id] = make_product(product_id)
+                make_line(order, products[product_id])
+
+        run = build_recommendations()
+        self.assertFalse(run.full)
+        incremental = self.stored_recommendations()
+
+        build_recommendations(full=True)
+        self.assertEqual(incremental, self.stored_recommendations())
+        self.assertEqual(max(rank for *_, rank in incremental), 2)
+
+    def test_recommended_products_exclude_bought(self):
+        self.make_baskets({1: [1, 2, 3], 2: [3, 4]})
+        other = make_customer("BONAP", "France", None, "Marseille")
+        make_line(make_order(3, other, "France", None, "Marseille"), Products.objects.get(pk=1))
+        build_recommendations(full=True)
+
+        with self.assertNumQueries(2):
+            recommended = list(other.get_recommended_products())
+        # 2 and 3 are each bought with product 1 once; neither has been bought by BONAP.
+        self.assertEqual([product.pk for product in recommended], [2, 3])
+
+
+# endregion Recommendations
+
+
+# region Revenue
+
+
+class RevenueBucketTests(TestCase):
+    def test_bucket_start(self):
+        day = datetime.date(2024, 11, 14)  # a Thursday
+        self.assertEqual(bucket_start(day, "day"), day)
+        self.assertEqual(bucket_start(day, "week"), datetime.date(2024, 11, 11))
+        self.assertEqual(bucket_start(day, "month"), datetime.date(2024, 11, 1))
+        self.assertEqual(bucket_start(day, "quarter"), datetime.date(2024, 10, 1))
+        # ISO weeks start on Monday, even across a year boundary.
+        self.assertEqual(
+            bucket_start(datetime.date(2025, 1, 1), "week"), datetime.date(2024, 12, 30)
+        )
+        monday = datetime.date(2024, 11, 11)
+        self.assertEqual(bucket_start(monday, "week"), monday)
+
+    def test_next_bucket_rolls_over_the_year(self):
+        self.assertEqual(
+            next_bucket(datetime.date(2024, 12, 31), "day"), datetime.date(2025, 1, 1)
+        )
+        self.assertEqual(
+            next_bucket(datetime.date(2024, 12, 30), "week"), datetime.date(2025, 1, 6)
+        )
+        self.assertEqual(
+            next_bucket(datetime.date(2024, 12, 1), "month"), datetime.date(2025, 1, 1)
+        )
+        self.assertEqual(
+            next_bucket(datetime.date(2024, 10, 1), "quarter"), datetime.date(2025, 1, 1)
+        )
+        self.assertEqual(
+            next_bucket(datetime.date(2024, 7, 1), "quarter"), datetime.date(2024, 10, 1)
+        )
+
+    def test_bucket_count_matches_buckets(self):
+        start, end = datetime.date(2023, 11, 29), datetime.date(2025, 2, 3)
+        for granularity in ("day", "week", "month", "quarter"):
+            periods = list(buckets(start, end, granularity))
+            self.assertEqual(bucket_count(start, end, granularity), len(periods))
+            self.assertLessEqual(periods[0], start)
+            self.assertGreater(next_bucket(periods[-1], granularity), end)
+        self.assertEqual(bucket_count(start, end, "quarter"), 6)
+
+    @override_settings(REVENUE_MAX_POINTS=12)
+    def test_choose_granularity_downsamples(self):
+        start = datetime.date(2024, 1, 1)
+        self.assertEqual(choose_granularity(start, datetime.date(2024, 1, 12), "day"), "day")
+        self.assertEqual(choose_granularity(start, datetime.date(2024, 1, 13), "day"), "week")
+        self.assertEqual(choose_granularity(start, datetime.date(2024, 6, 30), "day"), "month")
+        self.assertEqual(
+            choose_granularity(start, datetime.date(2026, 12, 31), "week"), "quarter"
+        )
+        # Never finer than requested.
+        self.assertEqual(choose_granularity(start, datetime.date(2024, 1, 2), "month"), "month")
+        with self.assertRaises(ValueError):
+            choose_granularity(start, datetime.date(2027, 1, 1), "day")
+
+
+class RevenueCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+        self.this_month = bucket_start(self.today, "month")
+        self.customer = make_customer("ALFKI", "Germany", None, "Berlin")
+        self.product = make_product(1)
+        self.next_order_id = 1
+
+    def tearDown(self):
+        cache.clear()
+
+    def months_ago(self, months):
+        month = self.this_month
+        for _ in range(months):
+            month = bucket_start(month - datetime.timedelta(days=1), "month")
+        return month
+
+    def sell(self, order_date, amount):
+        order = make_order(
+            self.next_order_id,
+            self.customer,
+            "Germany",
+            None,
+            "Berlin",
+            order_date=order_date,
+        )
+        self.next_order_id += 1
+        make_line(order, self.product, unit_price=amount)
+
+    def revenue(self, first, last):
+        series = revenue_series("month", first, last)
+        return {point["period"]: point["revenue"] for point in series["points"]}
+
+    def test_closed_buckets_served_from_cache(self):
+        self.sell(self.months_ago(2), 100.0)
+        self.sell(self.today, 5.0)
+
+        with self.assertNumQueries(1):
+            first = self.revenue(self.months_ago(3), self.today)
+        self.assertEqual(first[self.months_ago(2).isoformat()], 100.0)
+        self.assertEqual(first[self.this_month.isoformat()], 5.0)
+
+        # A late write to a closed month is not seen: that month comes from the cache.
+        # The open month is queried again and picks up today's new order.
+        self.sell(self.months_ago(2), 1000.0)
+        self.sell(self.today, 7.0)
+        with self.assertNumQueries(1):
+            second = self.revenue(self.months_ago(3), self.today)
+        self.assertEqual(second[self.months_ago(2).isoformat()], 100.0)
+        self.assertEqual(second[self.this_month.isoformat()], 12.0)
+
+    def test_only_missing_runs_are_queried(self):
+        self.sell(self.months_ago(6), 1.0)
+        self.sell(self.months_ago(3), 2.0)
+        self.sell(self.months_ago(1), 3.0)
+
+        # Warm months 4 - 2 ago.
+        self.revenue(self.months_ago(4), self.months_ago(2))
+
+        # One query for months 6 - 5 ago, one for last month through today.
+        with self.assertNumQueries(2):
+            series = self.revenue(self.months_ago(6), self.today)
+        self.assertEqual(list(series.values()), [1.0, 0.0, 0.0, 2.0, 0.0, 3.0, 0.0])
+
+        # Everything before the open month is now cached.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.revenue(self.months_ago(6), self.today), series)
+
+    def test_filters_are_cached_separately(self):
+        other = make_customer("BONAP", "France", None, "Marseille")
+        self.sell(self.months_ago(1), 10.0)
+        order = make_order(
+            99, other, "France", None, "Marseille", order_date=self.months_ago(1)
+        )
+        make_line(order, self.product, unit_price=20.0)
+
+        last_month = self.months_ago(1).isoformat()
+        self.assertEqual(self.revenue(self.months_ago(1), self.today)[last_month], 30.0)
+        series = revenue_series("month", self.months_ago(1), self.today, customer="BONAP")
+        self.assertEqual(series["points"][0], {"period": last_month, "revenue": 20.0})
+
+
+# endregion Revenue
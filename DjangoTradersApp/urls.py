@@ -21,6 +21,21 @@ urlpatterns = [
          views.CustomerDetailView.as_view(), 
          name='DjTraders.CustomerDetail'),
 
+    path(
+        'DjTraders/ProductDetail/<int:product_id>/', 
+         views.ProductDetailView.as_view(), 
+         name='DjTraders.ProductDetail'),
+
+    path(
+        'DjTraders/Geo',
+         views.GeoSummary,
+         name='DjTraders.Geo'),
+
+    path(
+        'DjTraders/Revenue',
+         views.RevenueSeries,
+         name='DjTraders.Revenue'),
+
 	#endregion Function View URLs
 
 	#region Class Based View URLs
@@ -1,8 +1,15 @@
+import datetime
+
 from django.views.generic import ListView, DetailView
+from django.http import Http404, JsonResponse
 from django.shortcuts import render
+from django.utils import timezone
 
 
-from .models import Customers
+from .geoAggregates import geo_aggregates
+from .models import Customers, CustomerRfmScore, Products
+from .revenue import GRANULARITIES, revenue_series
+from .streaming import stream_template
 
 
 # Create your views here.
@@ -19,13 +26,27 @@ def CustomersList(request):
     View function to display all customers.
     The context includes a list of all customer objects called customers.
     The data will be displayed in the all_customers.html template.
+
+    This is the "show all" page, so by default it is streamed: the page header
+    is sent immediately and the rows follow in chunks read from a server-side
+    cursor (see streaming.stream_template). ?stream=0 renders the whole page
+    in memory with render() instead.
     """
     customers = Customers.objects.all()
 
-    return render(
+    if request.GET.get("stream") == "0":
+        return render(
+            request=request,
+            template_name="DjangoTradersApp/Customers/List.html",
+            context={"customers": customers},
+        )
+
+    return stream_template(
         request=request,
         template_name="DjangoTradersApp/Customers/List.html",
-        context={"customers": customers},
+        rows_template_name="DjangoTradersApp/Customers/ListRows.html",
+        queryset=customers,
+        rows_context_name="customers",
     )
 
 
@@ -45,6 +66,77 @@ def CustomerDetail(request, customer_id):
 
 # endregion Function-based customer views
 
+# region Geo aggregate views
+def GeoSummary(request):
+    """
+    JSON drill-down of customer and order counts by country -> region -> city.
+
+    ?                          -> totals per country
+    ?country=USA               -> totals per region in the USA
+    ?country=USA&region=WA     -> totals per city in WA
+
+    An empty value (e.g. ?country=UK&region=) selects rows with no region recorded.
+    Counts come from geo_aggregates, so no GROUP BY runs per request.
+    """
+    path = []
+    for param in ("country", "region"):
+        if param not in request.GET:
+            break
+        path.append(request.GET[param] or None)
+
+    summary = geo_aggregates.summary(*path)
+    if summary is None:
+        raise Http404("No customers or orders for that location.")
+
+    return JsonResponse(summary)
+
+
+# endregion Geo aggregate views
+
+# region Revenue views
+def RevenueSeries(request):
+    """
+    JSON revenue over time.
+
+    ?granularity=day|week|month|quarter  (default month)
+    &start=YYYY-MM-DD&end=YYYY-MM-DD     (default: the year up to today)
+    &customer=ALFKI&product=11&employee=5 (optional filters)
+
+    Long ranges come back at a coarser granularity (see revenue.py);
+    the response says which granularity was used.
+    """
+    try:
+        granularity = request.GET.get("granularity", "month")
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}.")
+
+        end = request.GET.get("end")
+        end = datetime.date.fromisoformat(end) if end else timezone.localdate()
+        start = request.GET.get("start")
+        start = (
+            datetime.date.fromisoformat(start)
+            if start
+            else end - datetime.timedelta(days=365)
+        )
+
+        product = request.GET.get("product")
+        employee = request.GET.get("employee")
+        series = revenue_series(
+            granularity,
+            start,
+            end,
+            customer=request.GET.get("customer"),
+            product=int(product) if product else None,
+            employee=int(employee) if employee else None,
+        )
+    except ValueError as error:
+        return JsonResponse({"error": str(error)}, status=400)
+
+    return JsonResponse(series)
+
+
+# endregion Revenue views
+
 # region Class-based Customer views
 
 
@@ -71,13 +163,15 @@ class CustomerListView(ListView):
     model = Customers
     template_name = "DjangoTradersApp/Customers/Index.html"
     context_object_name = "customers"
+    # Page on the server; the table used to be paged client-side by DataTables.
+    paginate_by = 20
 
     def get_queryset(self):
         """
         Start with the default queryset and
         Get the filtered queryset based on search criteria.
         """
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related("rfm")
 
         customer_search = self.request.GET.get("customer")
         if customer_search:
@@ -105,6 +199,11 @@ class CustomerListView(ListView):
         if region_search:
             queryset = queryset.filter(region__exact=region_search)
 
+        ## Filter by RFM segment (precomputed by `manage.py score_customers`)
+        segment_search = self.request.GET.get("segment")
+        if segment_search:
+            queryset = queryset.filter(rfm__segment=segment_search)
+
         ## Sorting Functionality
         sort_by = self.request.GET.get("sort", "company_name")  # Default sort by company
         sort_order = self.request.GET.get("order", "asc")       # Default ascending
@@ -112,10 +211,23 @@ class CustomerListView(ListView):
         # List of valid fields that can be sorted
         valid_sort_fields = ['company_name', 'contact_name', 'contact_title', 'city', 'region', 'country']
 
-        if sort_by in valid_sort_fields:
+        # RFM columns live in the indexed customer_rfm_scores side table.
+        # Segments sort by rank (best first), then by score within the segment;
+        # when filtered to one segment the rank is constant, so only the score
+        # is ordered on and the (segment, -rfm_score) index serves the query.
+        rfm_sort_fields = {
+            "segment": ["-rfm__rfm_score"] if segment_search else ["rfm__segment_rank", "-rfm__rfm_score"],
+            "rfm_score": ["rfm__rfm_score"],
+        }
+
+        if sort_by in valid_sort_fields or sort_by in rfm_sort_fields:
+            sort_fields = rfm_sort_fields.get(sort_by, [sort_by])
             if sort_order == "desc":
-                sort_by = f"-{sort_by}"  
-            queryset = queryset.order_by(sort_by)  
+                sort_fields = [
+                    field[1:] if field.startswith("-") else f"-{field}"
+                    for field in sort_fields
+                ]
+            queryset = queryset.order_by(*sort_fields)
 
         return queryset
     
@@ -136,12 +248,15 @@ class CustomerListView(ListView):
         context["search_contact_title"] = self.request.GET.get("contact_title", "")
         # Adding context to region for Template
         context["search_region"] = self.request.GET.get("region", "")
+        # Adding context to RFM segment for Template
+        context["search_segment"] = self.request.GET.get("segment", "")
+        context["available_segments"] = CustomerRfmScore.SEGMENTS
         # Sorting Functionality for Template
         context["current_sort"] = self.request.GET.get("sort", "company_name")
         context["current_order"] = self.request.GET.get("order", "asc")
 
-        # Get distinct countries for dropdown
-        context["available_countries"] = Customers.get_countries()
+        # Get distinct countries for dropdown (served from the in-memory geo aggregates)
+        context["available_countries"] = geo_aggregates.countries()
 
         # Query string for sorting links
         get_params = self.request.GET.copy()
@@ -160,3 +275,21 @@ class CustomerDetailView(DetailView):
 
 
 # endregion Class-based Customer views
+
+# region Class-based Product views
+
+
+class ProductDetailView(DetailView):
+    """
+    View to display one product and the products most often bought with it.
+    Recommendations come from product.get_recommendations() in the template.
+    """
+
+    model = Products
+    template_name = "DjangoTradersApp/Products/Detail.html"
+    context_object_name = "product"
+    pk_url_kwarg = "product_id"
+    queryset = Products.objects.select_related("category", "supplier")
+
+
+# endregion Class-based Product views